@@ -1,13 +1,21 @@
 #!/usr/bin/env python3
 
-import json
 import logging
 import argparse
+import pickle
+from pathlib import Path
+from typing import Dict
 
 from egg.utils.logger import getLogger
-from egg.eval.analyzer import EGGAnalyzer
+from egg.eval.analyzer import EGGAnalyzer, iter_eval_data
+from egg.utils import serialization
 import numpy
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logger: logging.Logger = getLogger(
     name=__name__,
     consoleLevel=logging.INFO,
@@ -15,73 +23,169 @@ logger: logging.Logger = getLogger(
     log_file="app/analyze.log",
 )
 
+
+# NOTE: Formatted lazily by the logger, only when the record is emitted
+FAILURE_LOG_FORMAT = "\n".join(
+    [
+        "%s - %s",
+        "GT Answer: %s",
+        "Accuracy: %s",
+        "Gen Answer: %s",
+        "Gen Answer Explanation: %s",
+        "Eval Response: %s",
+        "Graph: %s\n\n",
+    ]
+)
+
+
+def _f1_counts(gt: numpy.ndarray, gen: numpy.ndarray):
+    """
+    Counts true positives, false positives and false negatives of binary answers.
+
+    :param gt: Ground truth answers as an int8 array of zeros and ones.
+    :type gt: numpy.ndarray
+    :param gen: Generated answers as an int8 array of zeros and ones.
+    :type gen: numpy.ndarray
+    :returns: The tp, fp and fn counts.
+    :rtype: Tuple[int, int, int]
+    """
+    tp = fp = fn = 0
+    for i in range(gt.shape[0]):
+        g, p = gt[i], gen[i]
+        tp += g & p
+        fp += (1 - g) & p
+        fn += g & (1 - p)
+    return tp, fp, fn
+
+
+if njit is not None:
+    _f1_counts = njit(cache=True)(_f1_counts)
+else:
+    # NOTE: Without numba, fall back to vectorized counts instead of the Python loop
+    def _f1_counts(gt: numpy.ndarray, gen: numpy.ndarray):
+        gt, gen = gt.astype(bool), gen.astype(bool)
+        return (
+            numpy.count_nonzero(gt & gen),
+            numpy.count_nonzero(~gt & gen),
+            numpy.count_nonzero(gt & ~gen),
+        )
+
+
+def load_full_graph(graph_file: str) -> Dict:
+    """
+    Loads the full graph that the optimal subgraphs are compared against.
+
+    The converted graph is pickled next to the graph file as
+    <graph_file>.analyze.cache.pkl, and reused as long as it is not older than
+    the graph file.
+
+    :param graph_file: Path to the serialized graph.
+    :type graph_file: str
+    :returns: The graph, with integer node and edge ids.
+    :rtype: Dict
+    """
+    src = Path(graph_file)
+    # NOTE: <graph>.cache.pkl holds the components of EGG.deserialize_cached,
+    # this cache holds the converted JSON document instead
+    cache = Path(graph_file + ".analyze.cache.pkl")
+    if cache.exists() and cache.stat().st_mtime >= src.stat().st_mtime:
+        logger.debug(f"Loading cached graph {cache}")
+        return pickle.loads(cache.read_bytes())
+
+    fg = serialization.loads(src.read_bytes())
+    # NOTE: Convert event ids to int
+    fg["nodes"]["event_nodes"] = {
+        int(k): v for k, v in fg["nodes"]["event_nodes"].items()
+    }
+    fg["nodes"]["object_nodes"] = {
+        int(k): v for k, v in fg["nodes"]["object_nodes"].items()
+    }
+    fg["edges"]["event_object_edges"] = {
+        int(k): v for k, v in fg["edges"]["event_object_edges"].items()
+    }
+    try:
+        cache.write_bytes(pickle.dumps(fg, protocol=5))
+    except OSError as e:
+        logger.warning(f"Could not cache graph to {cache}: {e}")
+    return fg
+
+
 parser = argparse.ArgumentParser()
 parser.add_argument("-m", "--modality", type=str, default="all")
 parser.add_argument("-r", "--results-file", type=str)
 parser.add_argument("-g", "--graph-file", type=str, default="./graph_gt.json")
 args = parser.parse_args()
 
-with open(args.graph_file) as fp:
-    fg = json.load(fp)
-
-# NOTE: Convert event ids to int
-event_ids = list(fg["nodes"]["event_nodes"].keys())
-for e_id in event_ids:
-    fg["nodes"]["event_nodes"][int(e_id)] = fg["nodes"]["event_nodes"].pop(e_id)
-object_ids = list(fg["nodes"]["object_nodes"].keys())
-for o_id in object_ids:
-    fg["nodes"]["object_nodes"][int(o_id)] = fg["nodes"]["object_nodes"].pop(o_id)
-edge_ids = list(fg["edges"]["event_object_edges"].keys())
-for ed_id in edge_ids:
-    fg["edges"]["event_object_edges"][int(ed_id)] = fg["edges"][
-        "event_object_edges"
-    ].pop(ed_id)
-
-analyzer = EGGAnalyzer(args.results_file)
 if args.modality == "failure":
-    failure_data = analyzer.get_failure_eval_data()
-    for id, eval_sample in failure_data.items():
+    # NOTE: Failures are only logged, stream them instead of loading all results
+    total_input_tokens, total_output_tokens = 0, 0
+    for id, eval_sample in iter_eval_data(args.results_file):
+        total_input_tokens += eval_sample["input_tokens"]
+        total_output_tokens += eval_sample["output_tokens"]
+        if eval_sample["accuracy"] == 1:
+            continue
         logger.info(
-            f"{id} - {eval_sample['query']}\n"
-            + f"GT Answer: {eval_sample['gt_answer']}\n"
-            + f"Accuracy: {eval_sample['accuracy']}\n"
-            + f"Gen Answer: {eval_sample['gen_answer']}\n"
-            + f"Gen Answer Explanation: {eval_sample['gen_answer_explanation']}\n"
-            + f"Eval Response: {eval_sample['eval_response']}\n"
-            + f"Graph: {eval_sample['optimal_subgraph']}\n\n"
+            FAILURE_LOG_FORMAT,
+            id,
+            eval_sample["query"],
+            eval_sample["gt_answer"],
+            eval_sample["accuracy"],
+            eval_sample["gen_answer"],
+            eval_sample["gen_answer_explanation"],
+            eval_sample["eval_response"],
+            eval_sample["optimal_subgraph"],
         )
 else:
-    for m in ["all", "text", "binary", "node", "time"]:
-        modality_data = analyzer.get_eval_data_by_modality(modality=m)
-        accuracy_list = []
-        compression_list = []
-        if m != "binary":
-            for id, eval_sample in modality_data.items():
-                graph_percentage = len(str(eval_sample["optimal_subgraph"])) / len(
-                    str(fg)
-                )
-                accuracy_list.append(eval_sample["accuracy"])
-                compression_list.append(graph_percentage)
-            logger.info(
-                f"Average accuracy of modality {m}: {numpy.mean(accuracy_list)}"
+    analyzer = EGGAnalyzer(
+        args.results_file,
+        fields=[
+            "modality",
+            "accuracy",
+            "gt_answer",
+            "gen_answer",
+            "optimal_subgraph",
+            "optimal_subgraph_len",
+            "input_tokens",
+            "output_tokens",
+        ],
+    )
+    # NOTE: Only the requested modality is analyzed, "all" also reports the others
+    if args.modality == "all":
+        modalities = ["all", "text", "binary", "node", "time"]
+    else:
+        modalities = [args.modality]
+    mean_modalities = [m for m in modalities if m != "binary"]
+    accuracies = {m: analyzer.get_accuracies(modality=m) for m in mean_modalities}
+    if "all" in modalities:
+        # NOTE: The full graph is constant, only measure it once
+        fg_len = len(str(load_full_graph(args.graph_file)))
+        all_data = analyzer.get_eval_data_by_modality(modality="all")
+        compressions = numpy.empty(len(all_data), dtype=numpy.float64)
+        for i, eval_sample in enumerate(all_data.values()):
+            subgraph_len = eval_sample.get("optimal_subgraph_len") or len(
+                str(eval_sample["optimal_subgraph"])
             )
+            compressions[i] = subgraph_len / fg_len
+
+    # NOTE: Average every modality in one reduction over contiguous segments
+    counts = numpy.array([len(accuracies[m]) for m in mean_modalities])
+    offsets = numpy.concatenate(([0], numpy.cumsum(counts)[:-1]))
+    non_empty = counts > 0
+    sums = numpy.zeros(len(mean_modalities), dtype=numpy.float64)
+    if non_empty.any():
+        sums[non_empty] = numpy.add.reduceat(
+            numpy.concatenate([accuracies[m] for m in mean_modalities]),
+            offsets[non_empty],
+        )
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        mean_accuracies = dict(zip(mean_modalities, sums / counts))
+
+    for m in modalities:
+        if m != "binary":
+            logger.info(f"Average accuracy of modality {m}: {mean_accuracies[m]}")
         else:
-            f1_score = 0
-            tp = 0
-            tn = 0
-            fp = 0
-            fn = 0
-            for id, eval_sample in modality_data.items():
-                bool_gt_ans = bool(int(eval_sample["gt_answer"]))
-                bool_gen_ans = bool(int(eval_sample["gen_answer"]))
-                if bool_gt_ans == True and bool_gen_ans == True:
-                    tp += 1
-                elif bool_gt_ans == False and bool_gen_ans == True:
-                    fp += 1
-                elif bool_gt_ans == False and bool_gen_ans == False:
-                    tn += 1
-                elif bool_gt_ans == True and bool_gen_ans == False:
-                    fn += 1
+            _, gt_ans, gen_ans = analyzer.get_binary_answers()
+            tp, fp, fn = (int(c) for c in _f1_counts(gt_ans, gen_ans))
             if 2 * tp + fp + fn == 0:
                 f1_score = 0
             else:
@@ -89,9 +193,9 @@ else:
             logger.info(f"F1 score of modality {m}: {f1_score}")
         if m == "all":
             logger.info(
-                f"Average compression % of modality {m}: {100 - (numpy.mean(compression_list) * 100)}%"
+                f"Average compression % of modality {m}: {100 - (compressions.mean() * 100)}%"
             )
-total_input_tokens, total_output_tokens = analyzer.get_token_usage()
+    total_input_tokens, total_output_tokens = analyzer.get_token_usage()
 logger.info(f"Total input tokens: {total_input_tokens}")
 logger.info(f"Total output tokens: {total_output_tokens}")
 logger.info(f"Total tokens: {total_input_tokens + total_output_tokens}\n\n")
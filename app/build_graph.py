@@ -1,7 +1,5 @@
 #!/usr/bin/env python3
 
-import glob
-import os
 import logging
 import argparse
 
@@ -9,13 +7,20 @@ from egg.graph.spatial import SpatialComponents
 from egg.graph.event import EventComponents
 from egg.graph.egg import EGG
 from egg.utils.logger import getLogger
+from egg.utils.read_data import get_event_param_files
 from egg.language.openai_agent import OpenaiAgent
+from egg.language.cached_agent import CachedAgent
 
 parser = argparse.ArgumentParser()
 parser.add_argument("-a", "--auto", action="store_true")
 parser.add_argument("--aalto", action="store_true")
 parser.add_argument("-u", "--unguided", action="store_true")
 parser.add_argument("-d", "--data-path", default="/home/ros/data/")
+parser.add_argument("--caption-workers", type=int, default=8)
+parser.add_argument("--vision-cache-size", type=int, default=20)
+parser.add_argument(
+    "--instance-view-reduction", type=int, default=1, choices=[1, 2, 4, 8]
+)
 args = parser.parse_args()
 
 viz_elements = []
@@ -36,6 +41,8 @@ egg = EGG(
     event_graph,
     use_gt_caption=use_gt_caption,
     use_guided_auto_caption=use_guided_auto_caption,
+    caption_cache_size=args.vision_cache_size,
+    instance_view_reduction=args.instance_view_reduction,
 )
 
 event_dirs = [
@@ -48,21 +55,19 @@ event_dirs = [
     f"{args.data_path}/batch_7/",
 ]
 
-yaml_files = []
 cam_config_file = "../configs/camera/astra2.yaml"
-for directory in event_dirs:
-    yaml_files += glob.glob(os.path.join(directory, "*.yaml")) + glob.glob(
-        os.path.join(directory, "*.yml")
-    )
+yaml_files = get_event_param_files(event_dirs)
 
-for event_param_file in sorted(yaml_files):
-    egg.add_event_from_video(
-        event_param_file=event_param_file,
-        camera_config_file=cam_config_file,
-    )
+egg.add_events_from_videos(
+    event_param_files=yaml_files,
+    camera_config_file=cam_config_file,
+)
 
 egg.gen_room_nodes()
-llm_agent = OpenaiAgent(use_mini=False, aalto=args.aalto)
-egg.gen_object_captions(llm_agent=llm_agent)
+llm_agent = CachedAgent(OpenaiAgent(use_mini=False, aalto=args.aalto))
+egg.gen_object_captions_batched(
+    llm_agent=llm_agent, max_concurrency=args.caption_workers
+)
+llm_agent.close()
 
 logger.info(egg.pretty_str())
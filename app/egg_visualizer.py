@@ -23,7 +23,7 @@ if __name__ == "__main__":
     spatial_graph = SpatialComponents()
     event_graph = EventComponents()
     egg = EGG(spatial_graph, event_graph)
-    egg.deserialize(args.file)
+    egg.deserialize_cached(args.file)
     egg.gen_room_nodes()
 
     vis = EGGVisualizer(
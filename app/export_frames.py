@@ -5,11 +5,12 @@ import tf
 from sensor_msgs.msg import Image
 from cv_bridge import CvBridge
 import cv2
-import json
 import signal
 import os
 import numpy as np
 
+from egg.utils import serialization
+
 
 class ImageOdometrySaver:
     def __init__(
@@ -111,7 +112,7 @@ class ImageOdometrySaver:
 
     def save_json(self):
         with open(os.path.join(self.out_directory, "image_odometry_data.json"), "w") as json_file:
-            json.dump(self.saved_data, json_file, indent=4)
+            serialization.dump(self.saved_data, json_file, indent=True)
         rospy.loginfo(f"Saved image data to {self.out_directory}/image_odometry_data.json")
 
 
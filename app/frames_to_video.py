@@ -3,9 +3,145 @@
 import cv2
 import os
 import argparse
-import glob
+import shutil
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-import yaml
+from egg.utils import yaml_cache
+from egg.utils.read_data import get_event_param_files
+
+# Number of frames decoded ahead of the video writer
+MAX_FRAMES_AHEAD = 8
+
+
+class NvencVideoWriter:
+    """
+    Minimal cv2.VideoWriter look-alike that pipes raw BGR frames into an
+    ffmpeg h264_nvenc encoder, so the encoding runs on the GPU.
+    """
+
+    def __init__(self, output_path, frame_rate, frame_size):
+        width, height = frame_size
+        self.process = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "rawvideo",
+                "-pix_fmt",
+                "bgr24",
+                "-s",
+                f"{width}x{height}",
+                "-r",
+                str(frame_rate),
+                "-i",
+                "-",
+                "-c:v",
+                "h264_nvenc",
+                "-preset",
+                "p4",
+                "-tune",
+                "ll",
+                "-pix_fmt",
+                "yuv420p",
+                output_path,
+            ],
+            stdin=subprocess.PIPE,
+        )
+
+    def write(self, image):
+        self.process.stdin.write(image.tobytes())
+
+    def release(self):
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self.process.wait()
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg h264_nvenc encoding failed ({returncode})")
+
+
+def nvenc_available():
+    # Check once whether ffmpeg can actually encode with NVENC. Listing
+    # h264_nvenc among the encoders only means ffmpeg was built with it, the
+    # GPU and driver may still be missing, so encode a single test frame
+    if not hasattr(nvenc_available, "result"):
+        nvenc_available.result = False
+        if shutil.which("ffmpeg") is not None:
+            probe = subprocess.run(
+                [
+                    "ffmpeg",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    "nullsrc=s=64x64",
+                    "-frames:v",
+                    "1",
+                    "-c:v",
+                    "h264_nvenc",
+                    "-f",
+                    "null",
+                    "-",
+                ],
+                capture_output=True,
+            )
+            nvenc_available.result = probe.returncode == 0
+    return nvenc_available.result
+
+
+def open_cv2_video_writer(output_path, frame_rate, frame_size):
+    fourcc = cv2.VideoWriter.fourcc(*"mp4v")  # Codec for mp4 output
+    return cv2.VideoWriter(output_path, fourcc, frame_rate, frame_size)
+
+
+def open_video_writer(output_path, frame_rate, frame_size):
+    # Prefer the GPU encoder, fall back to the OpenCV software encoder
+    if nvenc_available():
+        return NvencVideoWriter(output_path, frame_rate, frame_size)
+    return open_cv2_video_writer(output_path, frame_rate, frame_size)
+
+
+def read_frame(filepath):
+    # Check if the file exists, then read the image using OpenCV
+    filename = os.path.basename(filepath)
+    if not os.path.isfile(filepath):
+        print(f"Warning: File {filename} does not exist.")
+        return None
+    img = cv2.imread(filepath)
+    if img is None:
+        print(f"Warning: File {filename} not successfully loaded.")
+    return img
+
+
+def write_frame(img, video_writer, output_path, frame_rate):
+    if img is None:
+        return video_writer
+    if video_writer is None:
+        # Get the width, height from the first image (assuming all images have the same dimensions)
+        height, width, _ = img.shape
+        # Create a video writer, NVENC when available
+        video_writer = open_video_writer(output_path, frame_rate, (width, height))
+        if isinstance(video_writer, NvencVideoWriter):
+            try:
+                video_writer.write(img)
+                return video_writer
+            except BrokenPipeError:
+                # ffmpeg exited on start, use the software encoder from now on
+                video_writer.process.wait()
+                nvenc_available.result = False
+                print("Warning: NVENC encoder failed, falling back to mp4v.")
+                video_writer = open_cv2_video_writer(
+                    output_path, frame_rate, (width, height)
+                )
+    video_writer.write(img)
+    return video_writer
 
 
 def frames_to_video(
@@ -17,40 +153,33 @@ def frames_to_video(
     frame_folder=".",
 ):
     os.makedirs(output_dir, exist_ok=True)
-    # Initialize variables
-    images = []
-    # Loop through each frame index within the specified range
-    for index in range(start_index, end_index + 1):
-        # Create the filename for the current index
-        filename = f"color_frame_{index:04d}.png"
-        # Construct the full file path
-        filepath = os.path.join(frame_folder, filename)
-        # Check if the file exists
-        if os.path.isfile(filepath):
-            # Read the image using OpenCV
-            img = cv2.imread(filepath)
-            if img is not None:
-                # Append the image to the list if it's successfully loaded
-                images.append(img)
-            else:
-                print(f"Warning: File {filename} not successfully loaded.")
-        else:
-            print(f"Warning: File {filename} does not exist.")
+    # Build the file path of each frame index within the specified range
+    filepaths = [
+        os.path.join(frame_folder, f"color_frame_{index:04d}.png")
+        for index in range(start_index, end_index + 1)
+    ]
+    output_path = os.path.join(output_dir, output_filename)
+    video_writer = None
+    # Read the images in parallel and write them as they arrive, at most
+    # MAX_FRAMES_AHEAD decoded frames are held in memory
+    with ThreadPoolExecutor(
+        max_workers=min(MAX_FRAMES_AHEAD, (os.cpu_count() or 1) * 2)
+    ) as executor:
+        pending = deque()
+        for filepath in filepaths:
+            pending.append(executor.submit(read_frame, filepath))
+            if len(pending) >= MAX_FRAMES_AHEAD:
+                video_writer = write_frame(
+                    pending.popleft().result(), video_writer, output_path, frame_rate
+                )
+        while pending:
+            video_writer = write_frame(
+                pending.popleft().result(), video_writer, output_path, frame_rate
+            )
     # Check if any images have been loaded
-    if not images:
+    if video_writer is None:
         print("No images found, video creation aborted.")
         return
-    # Get the width, height from the first image (assuming all images have the same dimensions)
-    height, width, _ = images[0].shape
-
-    # Create a VideoWriter object
-    fourcc = cv2.VideoWriter.fourcc(*"mp4v")  # Codec for mp4 output
-    output_path = os.path.join(output_dir, output_filename)
-    video_writer = cv2.VideoWriter(output_path, fourcc, frame_rate, (width, height))
-
-    # Write each image to the video file
-    for image in images:
-        video_writer.write(image)
 
     # Release the video writer
     video_writer.release()
@@ -90,18 +219,13 @@ event_dirs = [
     "/home/ros/data/coffee_room_events/batch_4/events_gt/",
 ]
 
-yaml_files = []
+yaml_files = get_event_param_files(event_dirs)
 cam_config_file = "../configs/camera/astra2.yaml"
-for directory in event_dirs:
-    yaml_files += glob.glob(os.path.join(directory, "*.yaml")) + glob.glob(
-        os.path.join(directory, "*.yml")
-    )
 
 idx = 0
-for event_param_file in sorted(yaml_files):
+for event_param_file in yaml_files:
     idx += 1
-    with open(event_param_file, "r") as f:
-        event_data = yaml.safe_load(f)
+    event_data = yaml_cache.load(event_param_file)
     event_raw_data_path = event_data.get("image_path")
     event_dir = os.path.dirname(os.path.abspath(event_param_file))
     frame_folder = os.path.join(event_dir, event_raw_data_path) + "/color"
@@ -2,15 +2,17 @@
 
 import numpy as np
 from typing import Dict
-import json
 from tqdm import tqdm
 import logging
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 from egg.eval.dataset import QAGroundTruth
 from egg.language.openai_agent import OpenaiAgent
+from egg.language.cached_agent import CachedAgent
 from egg.eval.evaluator import EGGEvaluator
 from egg.utils.logger import getLogger
+from egg.utils import serialization
 from egg.utils.language_utils import get_eval_accuracy
 
 logger: logging.Logger = getLogger(
@@ -23,16 +25,20 @@ logger: logging.Logger = getLogger(
 parser = argparse.ArgumentParser()
 parser.add_argument("-f", "--file", default="./eval_trial_1_remembr_model_gpt-4o.json")
 parser.add_argument("--aalto", action="store_true")
+parser.add_argument("-w", "--workers", type=int, default=16)
+parser.add_argument("-c", "--cache-file", default="./eval_cache")
 args = parser.parse_args()
 
-with open(args.file, "r") as f:
-    benchmark_data: Dict = json.load(f)
+with open(args.file, "rb") as f:
+    benchmark_data: Dict = serialization.load(f)
 
-llm_agent = OpenaiAgent(aalto=args.aalto)
-evaluator = EGGEvaluator(llm_agent=llm_agent)
+# NOTE: Text answers are judged by the LLM, reuse its verdicts across eval runs
+llm_agent = CachedAgent(OpenaiAgent(aalto=args.aalto), cache_file=args.cache_file)
+output_file = args.file.replace(".json", "_eval_results.jsonl")
+evaluator = EGGEvaluator(llm_agent=llm_agent, output_file=output_file)
 
-accuracy_list = []
-for result in tqdm(benchmark_data.values()):
+
+def eval_one(qa_id: int, result: Dict) -> float:
     if "optimal_subgraph" in result.keys():
         optimal_subgraph = result["optimal_subgraph"]
     else:
@@ -40,14 +46,33 @@ for result in tqdm(benchmark_data.values()):
     qa_gt = QAGroundTruth(
         query=result["query"], modality=result["modality"], answer=result["gt_answer"]
     )
-    eval_response, accuracy = evaluator.eval_qa(
+    _, accuracy = evaluator.eval_qa(
         qa_gt=qa_gt,
         gen_answer=result["gen_answer"],
         optimal_subgraph=optimal_subgraph,
         input_tokens=result["input_tokens"] if "remembr" not in args.file else 0,
         output_tokens=result["output_tokens"] if "remembr" not in args.file else 0,
+        qa_id=qa_id,
+    )
+    return accuracy
+
+
+# NOTE: Each eval is an LLM round trip, run them concurrently
+with ThreadPoolExecutor(max_workers=args.workers) as executor:
+    accuracies = np.fromiter(
+        tqdm(
+            executor.map(
+                eval_one, range(1, len(benchmark_data) + 1), benchmark_data.values()
+            ),
+            total=len(benchmark_data),
+            mininterval=1.0,
+            miniters=10,
+        ),
+        dtype=np.float32,
+        count=len(benchmark_data),
     )
-    accuracy_list.append(accuracy)
-mean_accuracy = np.mean(accuracy_list)
+mean_accuracy = accuracies.mean()
 logger.info(f"Mean Accuracy: {mean_accuracy}")
-evaluator.save_eval_data(args.file.replace(".json", "_eval_results.json"))
+evaluator.save_eval_data(output_file)
+evaluator.close()
+llm_agent.close()
@@ -3,6 +3,8 @@
 import datetime
 import logging
 import argparse
+import os
+import sys
 
 from egg.graph.spatial import SpatialComponents
 from egg.graph.event import EventComponents
@@ -11,6 +13,7 @@ from egg.pruning.strategies import RetrievalStrategy
 from egg.utils.logger import getLogger
 from egg.pruning.egg_slicer import EGGSlicer
 from egg.pruning.query_processor import QueryProcessor
+from egg.pruning.query_daemon import DEFAULT_SOCKET, send_query, serve_queries
 from egg.language.openai_agent import OpenaiAgent
 from egg.language.ollama_agent import OllamaAgent
 
@@ -22,20 +25,45 @@ logger: logging.Logger = getLogger(
     fileLevel=logging.DEBUG,
     log_file="build_graph.log",
 )
-spatial_graph = SpatialComponents()
-event_graph = EventComponents()
-egg = EGG(spatial_graph, event_graph)
-
-egg.deserialize("./graph_auto_guided.json")
-
 parser = argparse.ArgumentParser()
 parser.add_argument("-q", "--query", type=str)
 parser.add_argument("-m", "--modality", type=str)
 parser.add_argument("--mini", action="store_true")
 parser.add_argument("--model", type=str, default="gpt-4o")
 parser.add_argument("--aalto", action="store_true")
+parser.add_argument("--serve", action="store_true")
+parser.add_argument("--socket", type=str, default=DEFAULT_SOCKET)
 args = parser.parse_args()
 
+# NOTE: A running daemon already holds the graph and the processor
+if not args.serve and os.path.exists(args.socket):
+    try:
+        phase_1_response, phase_2_response, phase_3_response, _, _ = send_query(
+            args.query, args.modality, address=args.socket
+        )
+    except (ConnectionRefusedError, FileNotFoundError, PermissionError) as e:
+        # NOTE: A killed daemon leaves its socket behind, and a socket directory
+        # another user could control is refused, answer in this process
+        logger.warning(f"Cannot use query daemon {args.socket} ({e}), answering here")
+    else:
+        model_args = ("model", "mini", "aalto")
+        if any(getattr(args, arg) != parser.get_default(arg) for arg in model_args):
+            logger.warning(
+                "--model, --mini and --aalto are ignored when a query daemon is "
+                + "running, the answer comes from the model the daemon was "
+                + "started with"
+            )
+        logger.info(f"Phase 1: {phase_1_response}")
+        logger.info(f"Phase 2: {phase_2_response}")
+        logger.info(f"Phase 3: {phase_3_response}")
+        sys.exit(0)
+
+spatial_graph = SpatialComponents()
+event_graph = EventComponents()
+egg = EGG(spatial_graph, event_graph)
+
+egg.deserialize_cached("./graph_auto_guided.json")
+
 current_time = "30th August 2025 23:59:00"
 # current_time = str(datetime.datetime.now())
 query = args.query
@@ -54,6 +82,9 @@ processor = QueryProcessor(
     llm_agent=llm_agent,
     retrieval_strategy=RetrievalStrategy.PRUNING_UNIFIED,
 )
+if args.serve:
+    serve_queries(processor, address=args.socket)
+    sys.exit(0)
 phase_1_response, phase_2_response, phase_3_response, _, _ = processor.process_query(
     args.query, args.modality
 )
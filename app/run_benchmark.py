@@ -2,13 +2,17 @@
 
 import logging
 import argparse
-import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
 from tqdm import tqdm
+import numpy as np
 
 from egg.pruning.egg_slicer import EGGSlicer
 from egg.pruning.query_processor import QueryProcessor
-from egg.eval.dataset import QADataset
+from egg.eval.dataset import QADataset, QAGroundTruth
+from egg.eval.qa_ground_truth import Modality
 from egg.graph.spatial import SpatialComponents
 from egg.graph.event import EventComponents
 from egg.graph.egg import EGG
@@ -16,6 +20,7 @@ from egg.language.openai_agent import OpenaiAgent
 from egg.language.ollama_agent import OllamaAgent
 from egg.pruning.strategies import RetrievalStrategy
 from egg.utils.logger import getLogger
+from egg.utils import serialization
 from egg.utils.language_utils import get_gen_answer
 
 logger: logging.Logger = getLogger(
@@ -33,6 +38,7 @@ parser.add_argument("--mini", action="store_true")
 parser.add_argument("-t", "--trial", type=int, default=1)
 parser.add_argument("--model", type=str, default="gpt-4o")
 parser.add_argument("--aalto", action="store_true")
+parser.add_argument("-w", "--workers", type=int, default=8)
 args = parser.parse_args()
 
 spatial_graph = SpatialComponents()
@@ -45,12 +51,17 @@ elif args.unguided:
     graph_file = "./graph_auto_unguided.json"
 else:
     graph_file = "./graph_auto_guided.json"
-egg.deserialize(json_file=graph_file)
+egg.deserialize_cached(json_file=graph_file)
 
 # logger.info(egg.get_events())
 
 qa_file = "/home/ros/data/egg_qa_remembr.csv"
 qa_dataset = QADataset(qa_file=qa_file, egg=egg)
+qa_modalities = qa_dataset.as_soa()["modalities"]
+for modality, count in zip(
+    Modality, np.bincount(qa_modalities, minlength=len(Modality))
+):
+    logger.info(f"{modality.name.lower()} queries: {count}")
 
 if "gpt" in args.model:
     llm_agent = OpenaiAgent(
@@ -76,14 +87,45 @@ else:
         "Valid strategies are: ['pruning_unified', 'pruning_unified_no_edge', 'spatial', 'event', 'no_edge', 'full_unified']"
     )
 
-egg_slicer = EGGSlicer(egg=egg)
 current_time = "30th August 2025 23:59:00"
-processor = QueryProcessor(
-    egg_slicer=egg_slicer,
-    current_time=current_time,
-    llm_agent=llm_agent,
-    retrieval_strategy=strategy,
-)
+thread_local = threading.local()
+
+
+def get_processor() -> QueryProcessor:
+    # NOTE: QueryProcessor keeps per-query state, so each worker gets its own
+    if not hasattr(thread_local, "processor"):
+        thread_local.processor = QueryProcessor(
+            egg_slicer=EGGSlicer(egg=egg),
+            current_time=current_time,
+            llm_agent=llm_agent,
+            retrieval_strategy=strategy,
+        )
+    return thread_local.processor
+
+
+def run_query(id: int, qa_gt: QAGroundTruth) -> Tuple[int, Dict]:
+    processor = get_processor()
+    _, _, gen_data, query_input_tokens, query_output_tokens = processor.process_query(
+        qa_gt.query, qa_gt.modality.name.lower()
+    )
+    gen_answer = get_gen_answer(
+        json_string=gen_data, modality=qa_gt.modality.name.lower()
+    )
+    gen_answer_explanation = serialization.loads(gen_data)["explanation"]
+    logger.debug(f"Query {id}: {qa_gt.query}")
+    logger.debug(f"modality: {qa_gt.modality.name.lower()}")
+    logger.debug(f"Gen answer: {gen_answer}")
+    return id, {
+        "query": qa_gt.query,
+        "modality": qa_gt.modality.name.lower(),
+        "gt_answer": qa_gt.answer,
+        "gen_answer": gen_answer,
+        "gen_answer_explanation": gen_answer_explanation,
+        "input_tokens": query_input_tokens,
+        "output_tokens": query_output_tokens,
+        "optimal_subgraph": str(processor.serialized_optimal_subgraph),
+    }
+
 
 accuracy = []
 logger.info(f"graph file used: {graph_file}")
@@ -93,46 +135,50 @@ output_dir = f"trial_{args.trial}"
 os.makedirs(output_dir, exist_ok=True)
 output_file = f"{output_dir}/eval_trial_{args.trial}_{args.strategy.lower()}_model_{args.model}_autocaption_{args.auto}_guided_{not args.unguided}.json"
 if os.path.isfile(output_file):
-    with open(output_file, "r") as f:
-        benchmark_data = json.load(f)
-        f.close()
+    with open(output_file, "rb") as f:
+        benchmark_data = serialization.load(f)
         logger.info(f"Loading prev benchmark data from: {output_file}")
 else:
     logger.info(
         f"No prev benchmark data from: {output_file}\nCreating new benchmark data file"
     )
     benchmark_data = {}
+# NOTE: Results are appended here one per line, and merged into output_file at the end
+partial_file = output_file + ".partial.jsonl"
+if os.path.isfile(partial_file):
+    with open(partial_file, "rb") as f:
+        for record in serialization.load_lines(f):
+            benchmark_data.update(record)
+    logger.info(f"Loading partial benchmark data from: {partial_file}")
 
-for id, qa_gt in enumerate(tqdm(qa_dataset.qa_ground_truth_list)):
+pending = []
+for id, qa_gt in enumerate(qa_dataset.qa_ground_truth_list):
     if str(id) not in benchmark_data.keys():
-        _, _, gen_data, query_input_tokens, query_output_tokens = (
-            processor.process_query(qa_gt.query, qa_gt.modality.name.lower())
-        )
-        gen_answer = get_gen_answer(
-            json_string=gen_data, modality=qa_gt.modality.name.lower()
-        )
-        gen_answer_explanation = json.loads(gen_data)["explanation"]
-        logger.debug(f"Query {id}: {qa_gt.query}")
-        logger.debug(f"modality: {qa_gt.modality.name.lower()}")
-        logger.debug(f"Gen answer: {gen_answer}")
-        gen_data = {
-            "query": qa_gt.query,
-            "modality": qa_gt.modality.name.lower(),
-            "gt_answer": qa_gt.answer,
-            "gen_answer": gen_answer,
-            "gen_answer_explanation": gen_answer_explanation,
-            "input_tokens": query_input_tokens,
-            "output_tokens": query_output_tokens,
-            "optimal_subgraph": str(processor.serialized_optimal_subgraph),
-        }
-        benchmark_data.update({id: gen_data})
-
-        with open(output_file, "w+") as f:
-            json.dump(benchmark_data, f)
-            f.close()
+        pending.append((id, qa_gt))
     else:
         logger.info(f"Skipping query {id}")
-total_input_tokens, total_output_tokens = processor.get_used_tokens()
+
+# NOTE: Queries are independent LLM round trips, run them concurrently. Results
+# are written from this thread only, in query order.
+total_input_tokens, total_output_tokens = 0, 0
+with ThreadPoolExecutor(max_workers=args.workers) as executor, open(
+    partial_file, "a"
+) as partial_fp:
+    for id, gen_data in tqdm(
+        executor.map(lambda item: run_query(*item), pending),
+        total=len(pending),
+        mininterval=1.0,
+        miniters=10,
+    ):
+        total_input_tokens += gen_data["input_tokens"]
+        total_output_tokens += gen_data["output_tokens"]
+        benchmark_data.update({id: gen_data})
+        serialization.dump_lines([{id: gen_data}], partial_fp)
+        partial_fp.flush()
+
+with open(output_file, "w") as f:
+    serialization.dump(benchmark_data, f)
+os.remove(partial_file)
 logger.info(f"Input tokens: {total_input_tokens}")
 logger.info(f"Output tokens: {total_output_tokens}")
 logger.info(f"Total tokens: {total_input_tokens + total_output_tokens}")
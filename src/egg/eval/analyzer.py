@@ -1,9 +1,17 @@
-import json
 import logging
-from typing import Dict
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from egg.utils.logger import getLogger
 from egg.eval.qa_ground_truth import Modality
+from egg.utils import serialization
+
+try:
+    import simdjson
+except ImportError:  # pragma: no cover - depends on the environment
+    simdjson = None
 
 
 logger: logging.Logger = getLogger(
@@ -13,14 +21,145 @@ logger: logging.Logger = getLogger(
     log_file="eval/evaluator.log",
 )
 
+_ALL_MODALITIES = frozenset(m.name.lower() for m in Modality)
+_TIME_MODALITIES = frozenset(
+    {Modality.TIME_INTERVAL.name.lower(), Modality.TIME_POINT.name.lower()}
+)
+
+
+def is_eval_data_lines(data_file: str) -> bool:
+    """
+    Tells whether an eval results file holds one JSON record per line, as
+    written by EGGEvaluator.save_eval_data, or a single JSON object. The format
+    is detected from the content, whatever the file name.
+
+    :param data_file: Path to the eval results file.
+    :type data_file: str
+    :returns: True if the first non-blank line is a complete JSON document.
+    :rtype: bool
+    """
+    with open(data_file, "rb") as fp:
+        for line in fp:
+            if line.strip():
+                try:
+                    serialization.loads(line)
+                except ValueError:
+                    return False
+                return True
+    return True
+
+
+def iter_eval_data(data_file: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    Iterates over the eval samples of a results file without loading all of it.
+
+    Files with one JSON record per line are streamed line by line, other files
+    are read as a single JSON object mapping query ids to their eval samples.
+
+    :param data_file: Path to the eval results file.
+    :type data_file: str
+    :returns: Iterator over (query id, eval sample) pairs.
+    :rtype: Iterator[Tuple[str, Dict]]
+    """
+    # NOTE: A single-line JSON object reads the same either way
+    as_lines = is_eval_data_lines(data_file)
+    with open(data_file, "rb") as fp:
+        if not as_lines:
+            yield from serialization.load(fp).items()
+            return
+        for record in serialization.load_lines(fp):
+            yield from record.items()
+
 
 class EGGAnalyzer:
     """
     Class to evaluate the results of EGG
     """
-    def __init__(self, eval_data_file: str):
-        with open(eval_data_file, "r") as fp:
-            self.eval_data: Dict = json.load(fp)
+    def __init__(self, eval_data_file: str, fields: Optional[Sequence[str]] = None):
+        """
+        Loads the eval results to analyze.
+
+        :param eval_data_file: Path to the eval results JSON file.
+        :type eval_data_file: str
+        :param fields: [Optional] Only keep these fields of each eval sample. When
+            pysimdjson is installed, the other fields are never materialized.
+        :type fields: Optional[Sequence[str]]
+        """
+        if fields is None:
+            self.eval_data: Dict = dict(iter_eval_data(eval_data_file))
+        else:
+            self.eval_data = self._load_eval_data_fields(eval_data_file, fields)
+        self._ids: List = list(self.eval_data.keys())
+        self._samples: List[Dict] = list(self.eval_data.values())
+        self._modality_index: Dict[str, np.ndarray] = self._build_modality_index()
+        self._accuracies: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _load_eval_data_fields(eval_data_file: str, fields: Sequence[str]) -> Dict:
+        """
+        Loads only the given fields of every eval sample.
+
+        :param eval_data_file: Path to the eval results JSON file.
+        :type eval_data_file: str
+        :param fields: Fields to keep for each eval sample.
+        :type fields: Sequence[str]
+        :returns: Dictionary mapping a query id to its selected fields.
+        :rtype: Dict
+        """
+        if simdjson is None or is_eval_data_lines(eval_data_file):
+            return {
+                q_id: {f: qa_data[f] for f in fields if f in qa_data}
+                for q_id, qa_data in iter_eval_data(eval_data_file)
+            }
+
+        with open(eval_data_file, "rb") as fp:
+            raw_data = fp.read()
+
+        def to_python(value: Any) -> Any:
+            if isinstance(value, simdjson.Object):
+                return value.as_dict()
+            if isinstance(value, simdjson.Array):
+                return value.as_list()
+            return value
+
+        # NOTE: The parser owns the document, keep it alive while reading proxies
+        parser = simdjson.Parser()
+        document = parser.parse(raw_data)
+        eval_data = {}
+        for q_id, qa_data in document.items():
+            available_fields = set(qa_data.keys())
+            eval_data[q_id] = {
+                f: to_python(qa_data[f]) for f in fields if f in available_fields
+            }
+        return eval_data
+
+    def _build_modality_index(self) -> Dict[str, np.ndarray]:
+        """
+        Indexes the positions of the eval samples of each modality in a single pass.
+
+        :returns: Dictionary mapping a modality name to the sorted positions of
+            its eval samples.
+        :rtype: Dict[str, np.ndarray]
+        """
+        modality_index = defaultdict(list)
+        for i, qa_data in enumerate(self._samples):
+            modality_index[qa_data["modality"]].append(i)
+        return {m: np.asarray(idx, dtype=np.int32) for m, idx in modality_index.items()}
+
+    def _get_modality_indices(self, modality: str) -> np.ndarray:
+        if modality == "time":
+            modalities = _TIME_MODALITIES
+        elif modality == "all":
+            modalities = _ALL_MODALITIES
+        else:
+            modalities = frozenset({modality})
+        indices = [
+            idx for m, idx in self._modality_index.items() if m in modalities
+        ]
+        if not indices:
+            return np.empty(0, dtype=np.int32)
+        # NOTE: Keep the order of the results file when merging modalities
+        return np.sort(np.concatenate(indices))
 
     def get_failure_eval_data(self):
         failure_data = {}
@@ -30,25 +169,59 @@ class EGGAnalyzer:
         return failure_data
 
     def get_eval_data_by_modality(self, modality: str):
-        eval_data_by_modality = {}
-        if modality == "time":
-            modality_list = [
-                Modality.TIME_INTERVAL.name.lower(),
-                Modality.TIME_POINT.name.lower(),
-            ]
-        elif modality == "all":
-            modality_list = [m.name.lower() for m in Modality]
-        else:
-            modality_list = [modality]
-        for q_id, qa_data in self.eval_data.items():
-            if qa_data["modality"] in modality_list:
-                eval_data_by_modality.update({q_id: qa_data})
-        return eval_data_by_modality
+        return {
+            self._ids[i]: self._samples[i] for i in self._get_modality_indices(modality)
+        }
+
+    def get_accuracies(self, modality: str) -> np.ndarray:
+        """
+        Gets the accuracies of the eval samples of a modality.
+
+        :param modality: Modality name, or "time" / "all" for groups of modalities.
+        :type modality: str
+        :returns: The accuracies, in the order of the results file.
+        :rtype: np.ndarray
+        """
+        if self._accuracies is None:
+            self._accuracies = np.fromiter(
+                (qa_data["accuracy"] for qa_data in self._samples),
+                dtype=np.float64,
+                count=len(self._samples),
+            )
+        return self._accuracies[self._get_modality_indices(modality)]
+
+    def get_binary_answers(self) -> Tuple[List, np.ndarray, np.ndarray]:
+        """
+        Gets the answers of the binary modality as arrays of zeros and ones.
+
+        :returns: The query ids, and the ground truth and generated answers as
+            int8 arrays in the same order.
+        :rtype: Tuple[List, np.ndarray, np.ndarray]
+        """
+        binary_data = self.get_eval_data_by_modality(modality="binary")
+        ids = list(binary_data.keys())
+        gt_answers = self._to_binary_array(
+            [qa_data["gt_answer"] for qa_data in binary_data.values()]
+        )
+        gen_answers = self._to_binary_array(
+            [qa_data["gen_answer"] for qa_data in binary_data.values()]
+        )
+        return ids, gt_answers, gen_answers
+
+    @staticmethod
+    def _to_binary_array(answers: List) -> np.ndarray:
+        # NOTE: Answers may be stored as ints or numeric strings, cast them all at once
+        return (np.asarray(answers).astype(np.int64) != 0).astype(np.int8)
 
     def get_token_usage(self):
-        total_input_tokens = 0
-        total_output_tokens = 0
-        for qa_data in self.eval_data.values():
-            total_input_tokens += qa_data["input_tokens"]
-            total_output_tokens += qa_data["output_tokens"]
-        return total_input_tokens, total_output_tokens
+        input_tokens = np.fromiter(
+            (qa_data["input_tokens"] for qa_data in self._samples),
+            dtype=np.int64,
+            count=len(self._samples),
+        )
+        output_tokens = np.fromiter(
+            (qa_data["output_tokens"] for qa_data in self._samples),
+            dtype=np.int64,
+            count=len(self._samples),
+        )
+        return int(input_tokens.sum()), int(output_tokens.sum())
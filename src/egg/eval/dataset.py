@@ -1,11 +1,14 @@
 import ast
-from typing import List
+from typing import Any, Dict, List
 import logging
 
+import numpy as np
+
 from egg.eval.qa_ground_truth import Modality, QAGroundTruth
 from egg.utils.read_data import read_qa_data
 from egg.graph.egg import EGG
 from egg.utils.logger import getLogger
+from egg.utils import serialization
 
 
 logger: logging.Logger = getLogger(
@@ -16,11 +19,33 @@ logger: logging.Logger = getLogger(
 )
 
 
+def parse_node_answer(answer: str) -> List[str]:
+    """
+    Parses a list of object names, as JSON when possible since it is much faster
+    than building a Python AST.
+
+    :param answer: String representation of the list of object names.
+    :type answer: str
+    :returns: The object names.
+    :rtype: List[str]
+    """
+    try:
+        return serialization.loads(answer)
+    except ValueError:
+        return ast.literal_eval(answer)
+
+
 class QADataset:
     def __init__(self, qa_file: str, egg: EGG):
         self.egg = egg
         qa_gt_df = read_qa_data(qa_file=qa_file)
+        # NOTE: Parse the node answers in one pass over the column
+        node_mask = qa_gt_df.iloc[:, 1] == "node"
+        qa_gt_df.loc[node_mask, qa_gt_df.columns[2]] = qa_gt_df.loc[
+            node_mask, qa_gt_df.columns[2]
+        ].map(parse_node_answer)
         self.qa_ground_truth_list: List[QAGroundTruth] = []
+        name_index = self.egg.get_spatial_components().name_index()
         for qa in qa_gt_df.values:
             query, modality, answer = qa
             if modality == "text":
@@ -28,12 +53,11 @@ class QADataset:
                     QAGroundTruth(query=query, modality=Modality.TEXT, answer=answer)
                 )
             elif modality == "node":
-                object_names = ast.literal_eval(answer)
-                is_valid_answer = True
-                for name in object_names:
-                    obj_id = self.egg.get_spatial_components().get_object_node_by_name(name)
-                    if obj_id is None:
-                        is_valid_answer = False
+                object_names = answer
+                missing_names = [n for n in object_names if n not in name_index]
+                for name in missing_names:
+                    logger.warning(f"Trying to look for non-existent object {name}")
+                is_valid_answer = not missing_names
                 if is_valid_answer:
                     self.qa_ground_truth_list.append(
                         QAGroundTruth(
@@ -60,6 +84,25 @@ class QADataset:
                 )
             else:
                 raise AssertionError(f"Invalid modality {modality}")
+
+    def as_soa(self) -> Dict[str, Any]:
+        """
+        Returns the dataset as parallel arrays instead of a list of QAGroundTruth.
+
+        :returns: Dictionary with the "queries" and "answers" lists, and the
+            "modalities" as an int8 array of Modality values.
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "queries": [qa.query for qa in self.qa_ground_truth_list],
+            "modalities": np.fromiter(
+                (qa.modality for qa in self.qa_ground_truth_list),
+                dtype=np.int8,
+                count=len(self.qa_ground_truth_list),
+            ),
+            "answers": [qa.answer for qa in self.qa_ground_truth_list],
+        }
+
     def pretty_str(self) -> str:
         dataset_str = ""
         for qa in self.qa_ground_truth_list:
@@ -1,18 +1,31 @@
+import asyncio
+import hashlib
 import logging
-from typing import Dict, List, Optional, Tuple
-import json
+import os
+import shutil
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from ast import literal_eval
 from datetime import datetime
 
+import numpy as np
+
 from egg.eval.qa_ground_truth import Modality, QAGroundTruth
 from egg.language.openai_agent import OpenaiAgent
-from egg.language.prompts.answer_templates import EVALUATOR_RESPONSE_FORMAT
+from egg.language.prompts.answer_templates import (
+    EVALUATOR_BATCH_RESPONSE_FORMAT,
+    EVALUATOR_RESPONSE_FORMAT,
+)
 from egg.utils.logger import getLogger
+from egg.utils import serialization
+from egg.eval.analyzer import iter_eval_data
 from egg.utils.language_utils import get_eval_accuracy
 from egg.language.prompts.evaluator_prompts import (
     build_evaluator_messages,
+    build_evaluator_messages_batch,
 )
-from torch import Value
 
 
 logger: logging.Logger = getLogger(
@@ -22,6 +35,8 @@ logger: logging.Logger = getLogger(
     log_file="eval/evaluator.log",
 )
 
+JUDGE_CACHE_SIZE = 8192
+
 
 def compute_f1_score_nodes(gt: List, pred: List) -> float:
     gt_set = set(gt)
@@ -36,19 +51,208 @@ def compute_f1_score_nodes(gt: List, pred: List) -> float:
     return f1_score
 
 
+def compute_f1_score_nodes_batch(gts: List[List], preds: List[List]) -> np.ndarray:
+    """
+    Computes the node F1-score of many QA pairs at once, with the same set
+    semantics as compute_f1_score_nodes. Meant for rescoring saved answers,
+    the evaluator scores each answer as it arrives with the scalar version.
+
+    :param gts: Ground truth node names of each QA pair.
+    :type gts: List[List]
+    :param preds: Generated node names of each QA pair.
+    :type preds: List[List]
+    :returns: F1-score of each QA pair.
+    :rtype: np.ndarray
+    """
+    assert len(gts) == len(preds), "Number of GT and pred answers must match"
+    num_rows = len(gts)
+    gt_rows = np.repeat(np.arange(num_rows), [len(gt) for gt in gts])
+    pred_rows = np.repeat(np.arange(num_rows), [len(pred) for pred in preds])
+    names = [n for gt in gts for n in gt] + [n for pred in preds for n in pred]
+    # NOTE: Hash every name once, then work on (row, code) integer keys. Codes
+    # come from a dict, so names match exactly when they would in a set
+    name_codes: Dict[Any, int] = {}
+    codes = np.fromiter(
+        (name_codes.setdefault(name, len(name_codes)) for name in names),
+        dtype=np.int64,
+        count=len(names),
+    )
+    num_codes = max(len(name_codes), 1)
+    gt_keys = np.unique(gt_rows * num_codes + codes[: gt_rows.size])
+    pred_keys = np.unique(pred_rows * num_codes + codes[gt_rows.size :])
+    correct_keys = np.intersect1d(gt_keys, pred_keys, assume_unique=True)
+
+    num_gt = np.bincount(gt_keys // num_codes, minlength=num_rows)
+    num_pred = np.bincount(pred_keys // num_codes, minlength=num_rows)
+    num_correct = np.bincount(correct_keys // num_codes, minlength=num_rows)
+    # NOTE: F1 = 2 * tp / (|gt| + |pred|), zero when nothing was guessed right
+    denom = num_gt + num_pred
+    return np.divide(
+        2.0 * num_correct,
+        denom,
+        out=np.zeros(num_rows, dtype=np.float64),
+        where=num_correct > 0,
+    )
+
+
+_TEXT_MODALITIES = frozenset({Modality.TEXT, "text"})
+
+
+def is_text_modality(qa_gt: QAGroundTruth) -> bool:
+    return qa_gt.modality in _TEXT_MODALITIES
+
+
+def _parse_node_list(answer: str) -> Any:
+    # NOTE: Answers are nearly always JSON lists, so try the C parser before the AST
+    try:
+        return serialization.loads(answer)
+    except ValueError:
+        pass
+    try:
+        return literal_eval(answer)
+    except (ValueError, SyntaxError):
+        logger.warning(
+            f"Gen answer for modality 'node' must be List, but got {answer}"
+        )
+        return [answer]
+
+
+def _as_str(value: Any) -> str:
+    return value if isinstance(value, str) else str(value)
+
+
+_BINARY_TRUE = frozenset({"yes", "true", "1"})
+_BINARY_FALSE = frozenset({"no", "false", "0"})
+
+
+def _score_binary(qa_gt: QAGroundTruth, gen_answer: Any) -> Tuple[Any, float]:
+    gen_lower = _as_str(gen_answer).lower()
+    if gen_lower in _BINARY_TRUE:
+        gen_answer = "1"
+    elif gen_lower in _BINARY_FALSE:
+        gen_answer = "0"
+    else:
+        logger.warning(f"Invalid binary answer: {gen_answer}")
+        return gen_answer, 0.0
+    return gen_answer, 1.0 if int(qa_gt.answer) == int(gen_answer) else 0.0
+
+
+def _score_node(qa_gt: QAGroundTruth, gen_answer: Any) -> Tuple[Any, float]:
+    if not isinstance(gen_answer, List):
+        gen_answer = _parse_node_list(_as_str(gen_answer))
+    if not isinstance(gen_answer, List):
+        gen_answer = [_as_str(gen_answer)]
+        logger.warning(
+            f"Gen answer for modality 'node' must be List, but got {gen_answer}"
+        )
+    assert isinstance(
+        qa_gt.answer, List
+    ), f"GT answer for modality 'node' must be List, but got {qa_gt.answer}"
+    accuracy = compute_f1_score_nodes(gt=qa_gt.answer, pred=gen_answer)
+    logger.debug(f"Nodes GT {qa_gt.answer}")
+    logger.debug(f"Nodes pred: {gen_answer}")
+    logger.debug(f"F1-score is {accuracy}")
+    return gen_answer, accuracy
+
+
+def _score_time_point(qa_gt: QAGroundTruth, gen_answer: Any) -> Tuple[Any, float]:
+    gt_answer = datetime.fromisoformat(_as_str(qa_gt.answer))
+    try:
+        gen_time = datetime.fromisoformat(_as_str(gen_answer))
+        time_diff = abs((gen_time - gt_answer).total_seconds() / 60.0)
+        logger.debug(f"Time diff is {time_diff}")
+        accuracy = 1.0 if time_diff < 2.0 else 0.0
+    except (ValueError, TypeError):
+        accuracy = 0.0
+    return gen_answer, accuracy
+
+
+# NOTE: Modalities may be given as Modality or as their lowercase name
+_SCORERS: Dict[Any, Callable[[QAGroundTruth, Any], Tuple[Any, float]]] = {
+    Modality.BINARY: _score_binary,
+    "binary": _score_binary,
+    Modality.NODE: _score_node,
+    "node": _score_node,
+    Modality.TIME_POINT: _score_time_point,
+    "time_point": _score_time_point,
+}
+
+
+def score_non_text(qa_gt: QAGroundTruth, gen_answer: Any) -> Tuple[Any, float]:
+    """
+    Scores a QA pair whose answer can be checked without the LLM judge, i.e. any
+    modality but text. Depends only on its arguments, so it can run in a worker
+    process.
+
+    :param qa_gt: Ground truth of the QA pair.
+    :type qa_gt: QAGroundTruth
+    :param gen_answer: Generated answer.
+    :type gen_answer: Any
+    :returns: The parsed generated answer and its accuracy.
+    :rtype: Tuple[Any, float]
+    """
+    scorer = _SCORERS.get(qa_gt.modality)
+    if scorer is None:
+        logger.error(f"Invalid modality: {qa_gt.modality}")
+        raise NotImplementedError
+    return scorer(qa_gt, gen_answer)
+
+
 class EGGEvaluator:
-    def __init__(self, llm_agent: OpenaiAgent, eval_data: Dict = {}):
+    def __init__(
+        self,
+        llm_agent: OpenaiAgent,
+        eval_data: Optional[Dict] = None,
+        output_file: Optional[str] = None,
+    ):
         self.agent = llm_agent
-        self.eval_data = eval_data
+        self.eval_data = eval_data if eval_data is not None else {}
         self._qa_id = 0
+        # NOTE: eval_qa may be called from several threads
+        self._lock = threading.Lock()
+        # NOTE: Repeated (query, gt, gen) triples reuse the judge's first verdict
+        self._judge_cache: OrderedDict[str, Dict] = OrderedDict()
+        self._accuracy_sum = 0.0
+        self._num_evaluated = 0
+        # NOTE: With an output file, each record is appended as soon as it is
+        # evaluated and is not kept in eval_data, so memory does not grow with
+        # the benchmark size
+        self._output_file = output_file
+        self._output_fp = None
+        if output_file is not None:
+            self._output_fp = open(output_file, "w")
+            serialization.dump_lines(
+                ({q_id: qa_data} for q_id, qa_data in self.eval_data.items()),
+                self._output_fp,
+            )
+            self.eval_data = {}
+
+    @property
+    def num_evaluated(self) -> int:
+        return self._num_evaluated
+
+    @property
+    def mean_accuracy(self) -> float:
+        """
+        :returns: Mean accuracy of the QA pairs evaluated so far, 0 if none.
+        :rtype: float
+        """
+        with self._lock:
+            if self._num_evaluated == 0:
+                return 0.0
+            return self._accuracy_sum / self._num_evaluated
 
     def reset(self):
-        self.eval_data = {}
-        self._qa_id = 0
+        with self._lock:
+            self.eval_data = {}
+            self._qa_id = 0
+            self._accuracy_sum = 0.0
+            self._num_evaluated = 0
 
     def get_id(self):
-        self._qa_id += 1
-        return self._qa_id
+        with self._lock:
+            self._qa_id += 1
+            return self._qa_id
 
     def eval_qa(
         self,
@@ -57,93 +261,326 @@ class EGGEvaluator:
         optimal_subgraph: Optional[Dict],
         input_tokens: int,
         output_tokens: int,
+        qa_id: Optional[int] = None,
     ) -> Tuple[str, float]:
-        eval_response = "None"
-        accuracy = 0.0
-        if qa_gt.modality in [Modality.TEXT, "text"]:
+        if is_text_modality(qa_gt):
             # If text, use llm to judge
-            eval_messages = build_evaluator_messages(
-                query=qa_gt.query, gt_answer=str(qa_gt.answer), gen_answer=gen_answer
-            )
-            eval_response, _, _ = self.agent.query_with_structured_output(
-                llm_message=eval_messages,
-                count_tokens=False,
-                response_format=EVALUATOR_RESPONSE_FORMAT,
-            )
-            eval_response = json.loads(str(eval_response))
+            eval_response = self._judge_text(qa_gt=qa_gt, gen_answer=gen_answer)
             accuracy = eval_response["accuracy"]
-        elif qa_gt.modality in [Modality.BINARY, "binary"]:
-            invalid_ans = False
-            if str(gen_answer).lower() in ["yes", "true"]:
-                gen_answer = "1"
-            elif str(gen_answer).lower() in ["no", "false"]:
-                gen_answer = "0"
-            else:
-                logger.warning(f"Invalid binary answer: {gen_answer}")
-                accuracy = 0.0
-                invalid_ans = True
-            if not invalid_ans:
-                accuracy = 1.0 if int(qa_gt.answer) == int(gen_answer) else 0.0
-        elif qa_gt.modality in [Modality.NODE, "node"]:
-            try:
-                gen_answer = literal_eval(str(gen_answer))
-            except ValueError:
-                gen_answer = [str(gen_answer)]
-                logger.warning(
-                    f"Gen answer for modality 'node' must be List, but got {gen_answer}"
+        else:
+            eval_response = "None"
+            gen_answer, accuracy = score_non_text(qa_gt=qa_gt, gen_answer=gen_answer)
+        self._record(
+            qa_id=qa_id,
+            qa_gt=qa_gt,
+            gen_answer=gen_answer,
+            eval_response=eval_response,
+            accuracy=accuracy,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            optimal_subgraph=optimal_subgraph,
+        )
+        return eval_response, accuracy
+
+    def eval_qa_batch(
+        self,
+        qa_gts: List[QAGroundTruth],
+        gen_answers: List[str],
+        optimal_subgraphs: List[Optional[Dict]],
+        input_tokens: List[int],
+        output_tokens: List[int],
+        qa_ids: Optional[List[int]] = None,
+        batch_size: int = 4,
+        num_workers: int = 0,
+    ) -> List[Tuple[str, float]]:
+        """
+        Evaluates several QA pairs, judging the text answers batch_size at a time
+        in a single LLM call. The other modalities are scored locally, optionally
+        in a process pool.
+
+        :param qa_gts: Ground truth of each QA pair.
+        :type qa_gts: List[QAGroundTruth]
+        :param gen_answers: Generated answer of each QA pair.
+        :type gen_answers: List[str]
+        :param optimal_subgraphs: Optimal subgraph used for each answer.
+        :type optimal_subgraphs: List[Optional[Dict]]
+        :param input_tokens: Input tokens used for each answer.
+        :type input_tokens: List[int]
+        :param output_tokens: Output tokens used for each answer.
+        :type output_tokens: List[int]
+        :param qa_ids: [Optional] Id of each QA pair, generated when not given.
+        :type qa_ids: Optional[List[int]]
+        :param batch_size: Number of text QA pairs judged per LLM call, small
+            batches keep the judge as accurate as single evaluations.
+        :type batch_size: int
+        :param num_workers: Number of worker processes scoring the other
+            modalities, 0 scores them in this process. Only pays off for batches
+            of thousands of QA pairs.
+        :type num_workers: int
+        :returns: The eval response and accuracy of each QA pair, in order.
+        :rtype: List[Tuple[str, float]]
+        """
+        if qa_ids is None:
+            qa_ids = [self.get_id() for _ in qa_gts]
+        text_indices = [i for i, qa_gt in enumerate(qa_gts) if is_text_modality(qa_gt)]
+        text_responses = {}
+        for start in range(0, len(text_indices), batch_size):
+            batch_indices = text_indices[start : start + batch_size]
+            text_responses.update(
+                zip(
+                    batch_indices,
+                    self._judge_text_batch(
+                        [qa_gts[i] for i in batch_indices],
+                        [gen_answers[i] for i in batch_indices],
+                    ),
                 )
-            if not isinstance(gen_answer, List):
-                gen_answer = [str(gen_answer)]
-                logger.warning(
-                    f"Gen answer for modality 'node' must be List, but got {gen_answer}"
+            )
+
+        local_indices = [i for i in range(len(qa_gts)) if i not in text_responses]
+        local_qa_gts = [qa_gts[i] for i in local_indices]
+        local_gen_answers = [gen_answers[i] for i in local_indices]
+        if num_workers > 0:
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                local_scores = list(
+                    executor.map(
+                        score_non_text, local_qa_gts, local_gen_answers, chunksize=64
+                    )
                 )
-            assert isinstance(
-                qa_gt.answer, List
-            ), f"GT answer for modality 'node' must be List, but got {qa_gt.answer}"
-            accuracy = compute_f1_score_nodes(gt=qa_gt.answer, pred=gen_answer)
-            logger.debug(f"Nodes GT {qa_gt.answer}")
-            logger.debug(f"Nodes pred: {gen_answer}")
-            logger.debug(f"F1-score is {accuracy}")
-        elif qa_gt.modality in [Modality.TIME_POINT, "time_point"]:
-            gt_answer = datetime.strptime(str(qa_gt.answer), "%Y-%m-%d %H:%M:%S")
-            try:
-                gen_time = datetime.strptime(str(gen_answer), "%Y-%m-%d %H:%M:%S")
-                time_diff = abs((gen_time - gt_answer).total_seconds() / 60.0)
-                logger.debug(f"Time diff is {time_diff}")
-                accuracy = 1.0 if time_diff < 2.0 else 0.0
-                time_diff = abs((gen_time - gt_answer).total_seconds() / 60.0)
-                logger.debug(f"Time diff is {time_diff}")
-                accuracy = 1.0 if time_diff < 2.0 else 0.0
-            except ValueError:
-                accuracy = 0.0
         else:
-            logger.error(f"Invalid modality: {qa_gt.modality}")
-            raise NotImplementedError
-        self.eval_data.update(
-            {
-                self.get_id(): {
-                    "query": qa_gt.query,
-                    "gt_answer": qa_gt.answer,
-                    "modality": (
-                        qa_gt.modality.name.lower()
-                        if isinstance(qa_gt.modality, Modality)
-                        else qa_gt.modality
-                    ),
-                    "gen_answer": gen_answer,
-                    "eval_response": eval_response,
-                    "accuracy": accuracy,
-                    "input_tokens": input_tokens,
-                    "output_tokens": output_tokens,
-                    "optimal_subgraph": optimal_subgraph,
-                }
-            }
+            local_scores = list(map(score_non_text, local_qa_gts, local_gen_answers))
+        local_scores = dict(zip(local_indices, local_scores))
+
+        results = []
+        for i, qa_gt in enumerate(qa_gts):
+            if i in text_responses:
+                gen_answer = gen_answers[i]
+                eval_response = text_responses[i]
+                accuracy = eval_response["accuracy"]
+            else:
+                eval_response = "None"
+                gen_answer, accuracy = local_scores[i]
+            self._record(
+                qa_id=qa_ids[i],
+                qa_gt=qa_gt,
+                gen_answer=gen_answer,
+                eval_response=eval_response,
+                accuracy=accuracy,
+                input_tokens=input_tokens[i],
+                output_tokens=output_tokens[i],
+                optimal_subgraph=optimal_subgraphs[i],
+            )
+            results.append((eval_response, accuracy))
+        return results
+
+    async def eval_qa_async(
+        self, semaphore: asyncio.Semaphore, **eval_qa_kwargs: Any
+    ) -> Tuple[str, float]:
+        """
+        Runs eval_qa without blocking the event loop, at most as many at a time as
+        the semaphore allows.
+
+        :param semaphore: Semaphore bounding the number of judge calls in flight.
+        :type semaphore: asyncio.Semaphore
+        :param eval_qa_kwargs: Keyword arguments of eval_qa.
+        :type eval_qa_kwargs: Any
+        :returns: The eval response and accuracy.
+        :rtype: Tuple[str, float]
+        """
+        async with semaphore:
+            return await asyncio.to_thread(self.eval_qa, **eval_qa_kwargs)
+
+    def eval_qa_concurrently(
+        self, eval_qa_kwargs_list: List[Dict[str, Any]], max_concurrency: int = 64
+    ) -> List[Tuple[str, float]]:
+        """
+        Evaluates many QA pairs with up to max_concurrency judge calls in flight.
+
+        :param eval_qa_kwargs_list: Keyword arguments of eval_qa for each QA pair.
+            Passing qa_id keeps the ids in order, as the calls finish out of order.
+        :type eval_qa_kwargs_list: List[Dict[str, Any]]
+        :param max_concurrency: Maximum number of concurrent judge calls.
+        :type max_concurrency: int
+        :returns: The eval response and accuracy of each QA pair, in order.
+        :rtype: List[Tuple[str, float]]
+        """
+
+        async def run() -> List[Tuple[str, float]]:
+            # NOTE: The agents are synchronous, size the thread pool to the semaphore
+            asyncio.get_running_loop().set_default_executor(
+                ThreadPoolExecutor(max_workers=max_concurrency)
+            )
+            semaphore = asyncio.Semaphore(max_concurrency)
+            return await asyncio.gather(
+                *(
+                    self.eval_qa_async(semaphore, **eval_qa_kwargs)
+                    for eval_qa_kwargs in eval_qa_kwargs_list
+                )
+            )
+
+        return asyncio.run(run())
+
+    def _judge_key(self, qa_gt: QAGroundTruth, gen_answer: str) -> str:
+        return hashlib.blake2b(
+            f"{qa_gt.query}|{_as_str(qa_gt.answer)}|{gen_answer}".encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+
+    def _get_cached_judgement(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            if key in self._judge_cache:
+                self._judge_cache.move_to_end(key)
+                return dict(self._judge_cache[key])
+        return None
+
+    def _cache_judgement(self, key: str, eval_result: Dict):
+        with self._lock:
+            self._judge_cache[key] = eval_result
+            if len(self._judge_cache) > JUDGE_CACHE_SIZE:
+                self._judge_cache.popitem(last=False)
+
+    def _judge_text(self, qa_gt: QAGroundTruth, gen_answer: str) -> Dict:
+        key = self._judge_key(qa_gt=qa_gt, gen_answer=gen_answer)
+        cached_result = self._get_cached_judgement(key)
+        if cached_result is not None:
+            return cached_result
+        eval_messages = build_evaluator_messages(
+            query=qa_gt.query, gt_answer=_as_str(qa_gt.answer), gen_answer=gen_answer
         )
-        return eval_response, accuracy
+        eval_response, _, _ = self.agent.query_with_structured_output(
+            llm_message=eval_messages,
+            count_tokens=False,
+            response_format=EVALUATOR_RESPONSE_FORMAT,
+        )
+        eval_result = serialization.loads(eval_response)
+        self._cache_judgement(key, eval_result)
+        return dict(eval_result)
+
+    def _judge_text_batch(
+        self, qa_gts: List[QAGroundTruth], gen_answers: List[str]
+    ) -> List[Dict]:
+        keys = [
+            self._judge_key(qa_gt=qa_gt, gen_answer=gen_answer)
+            for qa_gt, gen_answer in zip(qa_gts, gen_answers)
+        ]
+        eval_responses = [self._get_cached_judgement(key) for key in keys]
+        # NOTE: Only the pairs without a cached verdict go to the judge
+        missing = [i for i, response in enumerate(eval_responses) if response is None]
+        if len(missing) == 1:
+            i = missing[0]
+            eval_responses[i] = self._judge_text(
+                qa_gt=qa_gts[i], gen_answer=gen_answers[i]
+            )
+        if len(missing) <= 1:
+            return eval_responses
+        eval_messages = build_evaluator_messages_batch(
+            [
+                (qa_gts[i].query, _as_str(qa_gts[i].answer), gen_answers[i])
+                for i in missing
+            ]
+        )
+        eval_response, _, _ = self.agent.query_with_structured_output(
+            llm_message=eval_messages,
+            count_tokens=False,
+            response_format=EVALUATOR_BATCH_RESPONSE_FORMAT,
+        )
+        batch_results = {
+            result["id"]: {
+                "accuracy": result["accuracy"],
+                "explanation": result["explanation"],
+            }
+            for result in serialization.loads(eval_response)["results"]
+        }
+        for batch_id, i in enumerate(missing):
+            if batch_id not in batch_results:
+                # NOTE: The judge skipped this pair, evaluate it on its own
+                logger.warning(f"Batch judge skipped query {qa_gts[i].query}")
+                eval_responses[i] = self._judge_text(
+                    qa_gt=qa_gts[i], gen_answer=gen_answers[i]
+                )
+            else:
+                self._cache_judgement(keys[i], batch_results[batch_id])
+                eval_responses[i] = dict(batch_results[batch_id])
+        return eval_responses
+
+    def _record(
+        self,
+        qa_id: Optional[int],
+        qa_gt: QAGroundTruth,
+        gen_answer: Any,
+        eval_response: Any,
+        accuracy: float,
+        input_tokens: int,
+        output_tokens: int,
+        optimal_subgraph: Optional[Dict],
+    ):
+        if qa_id is None:
+            qa_id = self.get_id()
+        eval_record = {
+            qa_id: {
+                "query": qa_gt.query,
+                "gt_answer": qa_gt.answer,
+                "modality": (
+                    qa_gt.modality.name.lower()
+                    if isinstance(qa_gt.modality, Modality)
+                    else qa_gt.modality
+                ),
+                "gen_answer": gen_answer,
+                "eval_response": eval_response,
+                "accuracy": accuracy,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "optimal_subgraph": optimal_subgraph,
+                "optimal_subgraph_len": len(str(optimal_subgraph)),
+            }
+        }
+        with self._lock:
+            self._accuracy_sum += accuracy
+            self._num_evaluated += 1
+            if self._output_file is not None:
+                if self._output_fp is None:
+                    # NOTE: Reopened after close(), keeping earlier records
+                    self._output_fp = open(self._output_file, "a")
+                serialization.dump_lines([eval_record], self._output_fp)
+            else:
+                self.eval_data.update(eval_record)
 
     def save_eval_data(self, output_file: str):
+        if self._output_file is not None:
+            # NOTE: Records were already appended as they were evaluated, also
+            # when the output file has since been closed
+            with self._lock:
+                if self._output_fp is not None:
+                    self._output_fp.flush()
+            if os.path.abspath(output_file) != os.path.abspath(self._output_file):
+                shutil.copyfile(self._output_file, output_file)
+            return
+        # NOTE: One {qa_id: record} object per line, so results can be streamed back
         with open(output_file, "w") as fp:
-            json.dump(self.eval_data, fp)
+            serialization.dump_lines(
+                ({q_id: qa_data} for q_id, qa_data in self.eval_data.items()), fp
+            )
+
+    def close(self):
+        """
+        Closes the output file records are appended to, if any.
+        """
+        with self._lock:
+            if self._output_fp is not None:
+                self._output_fp.close()
+                self._output_fp = None
 
     def load_eval_data(self, data_file: str):
-        with open(data_file, "r") as fp:
-            self.eval_data = json.load(fp)
+        if self._output_file is not None:
+            if os.path.abspath(data_file) == os.path.abspath(self._output_file):
+                return
+            # NOTE: Streamed results only live in the output file, append the
+            # loaded records to it like the constructor does with eval_data
+            with self._lock:
+                if self._output_fp is None:
+                    self._output_fp = open(self._output_file, "a")
+                serialization.dump_lines(
+                    ({q_id: qa_data} for q_id, qa_data in iter_eval_data(data_file)),
+                    self._output_fp,
+                )
+            return
+        self.eval_data = dict(iter_eval_data(data_file))
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from numpy.typing import NDArray
 from datetime import datetime
 from typing import Union, List
-from enum import Enum
+from enum import IntEnum
 import logging
 
 from egg.utils.logger import getLogger
@@ -16,7 +16,7 @@ logger: logging.Logger = getLogger(
 )
 
 
-class Modality(Enum):
+class Modality(IntEnum):
 
     TEXT = 0
     NODE = 1
@@ -26,6 +26,10 @@ class Modality(Enum):
     TIME_INTERVAL = 5
     POSITION = 6
 
+    def __str__(self) -> str:
+        # NOTE: Keep the Enum formatting, IntEnum prints the bare value since 3.11
+        return f"{type(self).__name__}.{self.name}"
+
 
 @dataclass
 class QAGroundTruth:
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from enum import Enum
 import logging
 
@@ -13,7 +13,8 @@ logger: logging.Logger = getLogger(
 )
 
 
-@dataclass
+# NOTE: __slots__ are spelled out since dataclass(slots=True) needs Python 3.10
+@dataclass(frozen=True)
 class GraphEdge:
     """
     Represents a generic edge in a graph, characterized by its identifiers for
@@ -26,12 +27,25 @@ class GraphEdge:
     :param target_node_id: Node identifier where the edge points to.
     :type target_node_id: int
     """
+    __slots__ = ("edge_id", "source_node_id", "target_node_id")
+
     edge_id: int
     source_node_id: int
     target_node_id: int
 
+    def __getstate__(self):
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def __setstate__(self, state):
+        # NOTE: Frozen instances must bypass __setattr__, also when restoring
+        # edges pickled before they had slots (state is then their __dict__)
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **state[1]}
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
 
-@dataclass
+
+@dataclass(frozen=True)
 class EventObjectEdge(GraphEdge):
     """
     Represents an edge in the event-object graph, extending GraphEdge by adding
@@ -40,6 +54,8 @@ class EventObjectEdge(GraphEdge):
     :param object_role: Description of the object's role in the event context.
     :type object_role: str
     """
+    __slots__ = ("object_role",)
+
     object_role: str
 
     def pretty_str(self) -> str:
@@ -50,10 +66,9 @@ class EventObjectEdge(GraphEdge):
         :returns: A descriptive string of the event-object edge's properties.
         :rtype: str
         """
-        event_obj_edge_str = (
-            "\n🔗 Edge info:\n"
-            + f"- Edge ID: {self.edge_id}\n"
-            + f"Object role: {self.object_role}\n"
-            + f"From: {self.source_node_id} - To: {self.target_node_id}\n"
+        return (
+            f"\n🔗 Edge info:\n"
+            f"- Edge ID: {self.edge_id}\n"
+            f"Object role: {self.object_role}\n"
+            f"From: {self.source_node_id} - To: {self.target_node_id}\n"
         )
-        return event_obj_edge_str
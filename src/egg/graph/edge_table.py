@@ -0,0 +1,150 @@
+import logging
+from typing import List, Optional, Sequence
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from egg.graph.edge import EventObjectEdge
+from egg.utils.logger import getLogger
+
+
+logger: logging.Logger = getLogger(
+    name=__name__,
+    consoleLevel=logging.INFO,
+    fileLevel=logging.DEBUG,
+    log_file="graph/edge_table.log",
+)
+
+
+class EdgeTable:
+    """
+    Column-wise view of a list of event-object edges, so that filtering edges by
+    their source or target node is a single array operation instead of a loop
+    over the edge objects.
+
+    :param eid: Edge identifiers.
+    :type eid: np.ndarray
+    :param src: Source (event) node identifiers.
+    :type src: np.ndarray
+    :param tgt: Target (object) node identifiers.
+    :type tgt: np.ndarray
+    :param role: Object role of each edge, as an index into role_names stored in
+        the smallest unsigned integer type that fits.
+    :type role: np.ndarray
+    :param role_names: Distinct object roles.
+    :type role_names: np.ndarray
+    :param edges: [Optional] The edges the table was built from, in row order.
+    :type edges: Optional[List[EventObjectEdge]]
+    """
+
+    def __init__(
+        self,
+        eid: np.ndarray,
+        src: np.ndarray,
+        tgt: np.ndarray,
+        role: np.ndarray,
+        role_names: np.ndarray,
+        edges: Optional[List[EventObjectEdge]] = None,
+    ):
+        self.eid = eid
+        self.src = src
+        self.tgt = tgt
+        self.role = role
+        self.role_names = role_names
+        # NOTE: Edges are frozen, rows of a table built from edges return them as is
+        self._edges = edges
+        self._adjacency: Optional[csr_matrix] = None
+
+    @classmethod
+    def from_edges(cls, edges: Sequence[EventObjectEdge]) -> "EdgeTable":
+        """
+        Builds the table from a list of event-object edges.
+
+        :param edges: The edges to store.
+        :type edges: Sequence[EventObjectEdge]
+        :returns: The edge table.
+        :rtype: EdgeTable
+        """
+        num_edges = len(edges)
+        eid = np.fromiter((e.edge_id for e in edges), np.int64, count=num_edges)
+        src = np.fromiter((e.source_node_id for e in edges), np.int64, count=num_edges)
+        tgt = np.fromiter((e.target_node_id for e in edges), np.int64, count=num_edges)
+        role_names, role = np.unique(
+            np.array([e.object_role for e in edges], dtype=object), return_inverse=True
+        )
+        return cls(
+            eid=eid,
+            src=src,
+            tgt=tgt,
+            role=role.astype(np.min_scalar_type(max(len(role_names) - 1, 0))),
+            role_names=role_names,
+            edges=list(edges),
+        )
+
+    def __len__(self) -> int:
+        return self.eid.size
+
+    def to_edge(self, i: int) -> EventObjectEdge:
+        """
+        Gets the edge stored at a given row, rebuilding it when the table was
+        not built from edges.
+
+        :param i: Row of the edge in the table.
+        :type i: int
+        :returns: The edge.
+        :rtype: EventObjectEdge
+        """
+        if self._edges is not None:
+            return self._edges[i]
+        return EventObjectEdge(
+            edge_id=int(self.eid[i]),
+            source_node_id=int(self.src[i]),
+            target_node_id=int(self.tgt[i]),
+            object_role=str(self.role_names[self.role[i]]),
+        )
+
+    def to_edges(self, mask: Optional[np.ndarray] = None) -> List[EventObjectEdge]:
+        """
+        Gets the edges selected by a boolean mask, or all edges without one.
+
+        :param mask: Boolean mask over the rows of the table.
+        :type mask: Optional[np.ndarray]
+        :returns: The selected edges, in table order.
+        :rtype: List[EventObjectEdge]
+        """
+        rows = range(len(self)) if mask is None else np.flatnonzero(mask)
+        return [self.to_edge(i) for i in rows]
+
+    def from_sources(self, node_ids: Sequence[int]) -> np.ndarray:
+        """
+        :param node_ids: Source node identifiers to match.
+        :type node_ids: Sequence[int]
+        :returns: Boolean mask of the edges starting at one of the nodes.
+        :rtype: np.ndarray
+        """
+        return np.isin(self.src, np.fromiter(node_ids, np.int64))
+
+    def to_targets(self, node_ids: Sequence[int]) -> np.ndarray:
+        """
+        :param node_ids: Target node identifiers to match.
+        :type node_ids: Sequence[int]
+        :returns: Boolean mask of the edges ending at one of the nodes.
+        :rtype: np.ndarray
+        """
+        return np.isin(self.tgt, np.fromiter(node_ids, np.int64))
+
+    def adjacency(self) -> csr_matrix:
+        """
+        Sparse adjacency matrix from source to target node identifiers, built
+        on first use. Row i lists the objects taking part in event i.
+
+        :returns: The adjacency matrix.
+        :rtype: csr_matrix
+        """
+        if self._adjacency is None:
+            num_nodes = int(max(self.src.max(), self.tgt.max())) + 1 if len(self) else 0
+            self._adjacency = csr_matrix(
+                (np.ones(len(self), dtype=np.int8), (self.src, self.tgt)),
+                shape=(num_nodes, num_nodes),
+            )
+        return self._adjacency
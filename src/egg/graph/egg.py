@@ -1,10 +1,13 @@
-from copy import deepcopy
-import json
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import hashlib
 import logging
-from typing import List, Dict, Tuple, Optional
+import pickle
+import threading
+from typing import Callable, List, Dict, Tuple, Optional
 import cv2
 from numpy.typing import NDArray
-import yaml
 import numpy as np
 import os
 
@@ -12,15 +15,16 @@ from egg.graph.node import EventNode, ObjectNode, RoomNode
 from egg.graph.spatial import SpatialComponents
 from egg.graph.event import EventComponents
 from egg.graph.edge import EventObjectEdge
+from egg.graph.edge_table import EdgeTable
 from egg.utils.read_data import get_image_odometry_data
 from egg.utils.camera import Camera
 from egg.utils.image import (
-    xy_to_binary_mask,
-    get_instance_view,
+    xy_to_binary_mask_crop,
     concatenate_images_vertically,
 )
 from egg.utils.logger import getLogger
-from egg.utils.timestamp import ns_to_datetime, str_to_datetime, datetime_to_ns
+from egg.utils import serialization, yaml_cache
+from egg.utils.timestamp import ns_to_str, str_to_ns
 from egg.language.prompts.image_captioning_prompts import (
     build_image_captioning_messages,
 )
@@ -34,10 +38,110 @@ logger: logging.Logger = getLogger(
     log_file="graph/egg.log",
 )
 
+# NOTE: Module level since EGG instances get deep-copied, which locks do not support
+_caption_cache_lock = threading.Lock()
+
+
+MEDIAN_MAX_POINTS = 4096
+
+# NOTE: Bump when the fields of the cached components change, so pickles of an
+# older layout are rebuilt instead of missing attributes
+GRAPH_CACHE_VERSION = 1
+
+
+def cloud_median(
+    cloud: NDArray, max_points: int = MEDIAN_MAX_POINTS, overwrite_input: bool = False
+) -> NDArray:
+    """
+    Per-axis median of a point cloud, used as the representative position of an
+    object. Dense clouds are evenly subsampled to at most about max_points points
+    first, which barely moves the median but avoids selecting over every point.
+
+    :param cloud: Point cloud of shape (N, 3).
+    :type cloud: NDArray
+    :param max_points: Number of points above which the cloud is subsampled.
+    :type max_points: int
+    :param overwrite_input: Whether the points may be reordered in place, which
+        saves copying them when the cloud is not used afterwards.
+    :type overwrite_input: bool
+    :returns: The median position.
+    :rtype: NDArray
+    """
+    if len(cloud) > max_points:
+        # NOTE: Points come in pixel order, a stride samples the whole mask evenly
+        cloud = cloud[:: -(-len(cloud) // max_points)]
+    # NOTE: np.median already selects with np.partition, it does not sort
+    return np.median(cloud, axis=0, overwrite_input=overwrite_input)
+
+
+@dataclass
+class ObjectObservation:
+    """
+    Observation of an object of interest in one event, before it is added to EGG.
+
+    :param name: Name of the object.
+    :type name: str
+    :param object_class: Classification of the object.
+    :type object_class: str
+    :param description: [Optional] Ground truth role of the object in the event.
+    :type description: Optional[str]
+    :param timestamped_position: Position data indexed by timestamps.
+    :type timestamped_position: Dict[int, NDArray]
+    :param instance_views: Visual observations of the object.
+    :type instance_views: List[NDArray]
+    """
+    name: str
+    object_class: str
+    description: Optional[str]
+    timestamped_position: Dict[int, NDArray]
+    instance_views: List[NDArray]
+
+
+@dataclass
+class EventRecord:
+    """
+    Everything loaded from an event video, before it is added to EGG.
+
+    :param event_param_file: Path to the YAML file with event parameters.
+    :type event_param_file: str
+    :param event_description: [Optional] Ground truth description of the event.
+    :type event_description: Optional[str]
+    :param location: Location where the event takes place.
+    :type location: str
+    :param start: Start timestamp of the event.
+    :type start: int
+    :param end: End timestamp of the event.
+    :type end: int
+    :param timestamped_observation_odom: Odometry data associated with timestamps.
+    :type timestamped_observation_odom: Dict[int, Dict[str, List]]
+    :param object_observations: Observations of the objects involved in the event.
+    :type object_observations: List[ObjectObservation]
+    """
+    event_param_file: str
+    event_description: Optional[str]
+    location: str
+    start: int
+    end: int
+    timestamped_observation_odom: Dict[int, Dict[str, List]]
+    object_observations: List[ObjectObservation]
+
+# NOTE: JPEG frames are decoded directly at the reduced size, PNG ones are resized
+IMREAD_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
 
 class EGG:
     """
     EGG (Event-Grounding Graph) framework that grounds events semantic context to spatial geometrics.
+
+    Nodes returned by the getters are shared with the graph and must be treated
+    as read-only. Code that only reads graph state goes through `self.spatial`
+    and `self.events` directly, `get_*_components` snapshots are meant for callers
+    that replace nodes, and `clone` for callers that modify them in place.
     """
 
     def __init__(
@@ -49,6 +153,8 @@ class EGG:
         use_guided_auto_caption: bool = True,
         device: str = "cuda:0",
         do_sample: bool = False,
+        caption_cache_size: int = 20,
+        instance_view_reduction: int = 1,
     ):
         """
         Initializes the EGG framework with specified spatial and event components
@@ -68,11 +174,24 @@ class EGG:
         :type device: str
         :param do_sample: Whether sampling is used in GPT4o for image caption generation.
         :type do_sample: bool
+        :param caption_cache_size: Number of captions kept for recently captioned object views.
+        :type caption_cache_size: int
+        :param instance_view_reduction: Factor by which color frames are downscaled while decoding them for the object instance views, one of 1, 2, 4 or 8.
+        :type instance_view_reduction: int
         """
         self.spatial: SpatialComponents = spatial
         self.events: EventComponents = events
         self.event_edges: List[EventObjectEdge] = []
+        # NOTE: Built on demand, reset wherever event_edges changes
+        self._edge_table: Optional[EdgeTable] = None
         self._entity_id: int = 0
+        # NOTE: Merged objects may share views, those are only captioned once
+        self._caption_cache: OrderedDict[bytes, str] = OrderedDict()
+        self._caption_cache_size = caption_cache_size
+        assert (
+            instance_view_reduction in IMREAD_REDUCED_FLAGS
+        ), f"Instance view reduction must be one of {list(IMREAD_REDUCED_FLAGS)}"
+        self.instance_view_reduction: int = instance_view_reduction
         self.use_gt_id: bool = use_gt_id
         self.use_gt_caption: bool = use_gt_caption
         if not self.use_gt_caption:
@@ -110,24 +229,47 @@ class EGG:
         :type event_edges: List[EventObjectEdge]
         """
         self.event_edges = event_edges
+        self._edge_table = None
 
     def get_spatial_components(self) -> SpatialComponents:
         """
-        Retrieves a copy of the current spatial component.
+        Retrieves a snapshot of the current spatial component. The nodes are
+        shared with EGG, use `clone` on the result before modifying them.
 
-        :returns: A copy of the spatial components.
+        :returns: A snapshot of the spatial components.
         :rtype: SpatialComponents
         """
-        return deepcopy(self.spatial)
+        return self.spatial.snapshot()
 
     def get_event_components(self) -> EventComponents:
         """
-        Retrieves a copy of the current event component.
+        Retrieves a snapshot of the current event component. The nodes are
+        shared with EGG, use `clone` on the result before modifying them.
+
+        :returns: A snapshot of the event components.
+        :rtype: EventComponents
+        """
+        return self.events.snapshot()
+
+    def get_spatial_components_view(self) -> SpatialComponents:
+        """
+        Retrieves the spatial components themselves, without copying them, for
+        read-only use.
+
+        :returns: The spatial components of EGG.
+        :rtype: SpatialComponents
+        """
+        return self.spatial
+
+    def get_event_components_view(self) -> EventComponents:
+        """
+        Retrieves the event components themselves, without copying them, for
+        read-only use.
 
-        :returns: A copy of the event components.
+        :returns: The event components of EGG.
         :rtype: EventComponents
         """
-        return deepcopy(self.events)
+        return self.events
 
     def get_event_edges(self) -> List[EventObjectEdge]:
         """
@@ -136,7 +278,20 @@ class EGG:
         :returns: A copy of the event-object edges list.
         :rtype: List[EventObjectEdge]
         """
-        return deepcopy(self.event_edges)
+        # NOTE: Edges are frozen, copying the list is enough
+        return list(self.event_edges)
+
+    def get_edge_table(self) -> EdgeTable:
+        """
+        Retrieves the event-object edges as a column-wise table. The table is
+        built once and rebuilt after the edges change.
+
+        :returns: The event-object edges table.
+        :rtype: EdgeTable
+        """
+        if self._edge_table is None:
+            self._edge_table = EdgeTable.from_edges(self.event_edges)
+        return self._edge_table
 
     def get_objects(self) -> Dict[int, Dict[str, str]]:
         """
@@ -146,7 +301,7 @@ class EGG:
         :rtype: Dict[int, Dict[str, str]]
         """
         objects = {}
-        for node in self.spatial.get_all_object_nodes().values():
+        for node in self.spatial.get_object_nodes_view().values():
             objects.update(
                 {node.node_id: {"name": node.name, "description": node.caption}}
             )
@@ -164,7 +319,7 @@ class EGG:
             events.update(
                 {
                     node.node_id: {
-                        "start": str(ns_to_datetime(node.start)),
+                        "start": ns_to_str(node.start),
                         "description": node.event_description,
                     }
                 }
@@ -181,20 +336,84 @@ class EGG:
         :param camera_config_file: Path to the camera configuration file in YAML format.
         :type camera_config_file: str
         """
+        self.ingest_event(
+            self.load_event_from_video(
+                event_param_file=event_param_file,
+                camera_config_file=camera_config_file,
+            )
+        )
+
+    def add_events_from_videos(
+        self,
+        event_param_files: List[str],
+        camera_config_file: str,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Integrates several videos into EGG. The files are loaded concurrently, then
+        ingested one by one in the given order so node ids and object merging are
+        the same as calling `add_event_from_video` in a loop.
+
+        :param event_param_files: Paths to the YAML files with event parameters.
+        :type event_param_files: List[str]
+        :param camera_config_file: Path to the camera configuration file in YAML format.
+        :type camera_config_file: str
+        :param max_workers: [Optional] Number of loader threads, defaults to the CPU count.
+        :type max_workers: Optional[int]
+        """
+        num_loaders = max_workers or os.cpu_count() or 1
+        # NOTE: Each loader reads its frames with its own pool, share the CPUs
+        # between them instead of starting a full pool per loader
+        frame_workers = max(1, (os.cpu_count() or 1) // num_loaders)
+        with ThreadPoolExecutor(max_workers=num_loaders) as executor:
+            # NOTE: map submits everything upfront and loaded records hold their
+            # instance views, bound it to keep memory flat
+            pending = deque()
+            for event_param_file in event_param_files:
+                pending.append(
+                    executor.submit(
+                        self.load_event_from_video,
+                        event_param_file=event_param_file,
+                        camera_config_file=camera_config_file,
+                        max_workers=frame_workers,
+                    )
+                )
+                if len(pending) > num_loaders:
+                    self.ingest_event(pending.popleft().result())
+            while pending:
+                self.ingest_event(pending.popleft().result())
+
+    def load_event_from_video(
+        self,
+        event_param_file: str,
+        camera_config_file: str,
+        max_workers: Optional[int] = None,
+    ) -> EventRecord:
+        """
+        Reads the event parameters, odometry and frames of a video and extracts the
+        observations of its objects, without modifying EGG.
+
+        :param event_param_file: Path to the YAML file with event parameters.
+        :type event_param_file: str
+        :param camera_config_file: Path to the camera configuration file in YAML format.
+        :type camera_config_file: str
+        :param max_workers: [Optional] Number of threads reading the frames, defaults to the CPU count.
+        :type max_workers: Optional[int]
+        :returns: The event record, ready to be ingested.
+        :rtype: EventRecord
+        """
         # TODO: Somehow do tracking automatically
-        # TODO: Match similar object nodes
-        with open(event_param_file, "r") as event_param_fh:
-            event_data = yaml.safe_load(event_param_fh)
+        event_data = yaml_cache.load(event_param_file)
         event_raw_data_path = event_data.get("image_path")
         event_dir = os.path.dirname(os.path.abspath(event_param_file))
-        color_frame_file_template = (
-            os.path.join(event_dir, event_raw_data_path)
-            + "/color/color_frame_{frame_id}.png"
-        )
-        depth_frame_file_template = (
-            os.path.join(event_dir, event_raw_data_path)
-            + "/depth/depth_frame_{frame_id}.npy"
-        )
+        frames_dir = os.path.join(event_dir, event_raw_data_path)
+
+        def color_frame_file(frame_id: int) -> str:
+            return f"{frames_dir}/color/color_frame_{frame_id:04d}.png"
+
+        def depth_frame_file(frame_id: int) -> str:
+            return f"{frames_dir}/depth/depth_frame_{frame_id:04d}.npy"
+
         image_odometry_file = os.path.join(
             event_dir, event_data.get("image_odometry_file")
         )
@@ -207,27 +426,50 @@ class EGG:
         )
         camera = Camera.from_yaml(yaml_file=camera_config_file)
 
+        object_observations = self.load_objects_from_event(
+            event_data=event_data,
+            frame_timestamp_map=frame_timestamp_map,
+            camera=camera,
+            color_frame_file=color_frame_file,
+            depth_frame_file=depth_frame_file,
+            timestamped_observation_odom=timestamped_observation_odom,
+            max_workers=max_workers,
+        )
+        return EventRecord(
+            event_param_file=event_param_file,
+            event_description=event_data.get("event_description"),
+            location=event_data.get("location"),
+            start=start_ns,
+            end=end_ns,
+            timestamped_observation_odom=timestamped_observation_odom,
+            object_observations=object_observations,
+        )
+
+    def ingest_event(self, event_record: EventRecord):
+        """
+        Adds a loaded event, its objects and event-object edges to EGG.
+
+        :param event_record: The event record produced by `load_event_from_video`.
+        :type event_record: EventRecord
+        """
+        # TODO: Match similar object nodes
         event_node_id = self.gen_id()
 
         if self.use_gt_caption:
-            event_description = event_data.get("event_description")
+            event_description = event_record.event_description
             edge_captions = None
         else:
             event_description, edge_captions = (
                 self.vlm_agent.generate_captions_from_yaml(
-                    event_param_file, guided=self.use_guided_auto_caption
+                    event_record.event_param_file,
+                    guided=self.use_guided_auto_caption,
                 )
             )
 
         object_nodes, event_object_edges, involved_object_ids = (
             self.get_object_nodes_and_edges_from_event(
-                event_data=event_data,
+                object_observations=event_record.object_observations,
                 event_node_id=event_node_id,
-                frame_timestamp_map=frame_timestamp_map,
-                camera=camera,
-                color_frame_file_template=color_frame_file_template,
-                depth_frame_file_template=depth_frame_file_template,
-                timestamped_observation_odom=timestamped_observation_odom,
                 edge_captions=edge_captions,
             )
         )
@@ -235,16 +477,17 @@ class EGG:
             self.spatial.add_object_node(new_object_node)
         for edge in event_object_edges:
             self.event_edges.append(edge)
+        self._edge_table = None
 
         self.events.add_event_node(
             event_node=EventNode(
                 node_id=event_node_id,
-                start=start_ns,
-                end=end_ns,
+                start=event_record.start,
+                end=event_record.end,
                 event_description=event_description,
-                timestamped_observation_odom=timestamped_observation_odom,
+                timestamped_observation_odom=event_record.timestamped_observation_odom,
                 involved_object_ids=involved_object_ids,
-                location=event_data.get("location"),
+                location=event_record.location,
             )
         )
 
@@ -255,6 +498,7 @@ class EGG:
         timestamped_observation_odom: Dict[int, Dict[str, List]],
         depth_frame: NDArray,
         mask: NDArray,
+        pixel_origin: Optional[Tuple[int, int]] = None,
     ) -> NDArray:
         """
         Converts depth frame data into a point cloud for an object at a specific timestamp.
@@ -269,6 +513,8 @@ class EGG:
         :type depth_frame: NDArray
         :param mask: Pixel mask specifying the region corresponding to the object.
         :type mask: NDArray
+        :param pixel_origin: [Optional] Top-left (u, v) pixel of depth_frame and mask, when they are crops.
+        :type pixel_origin: Optional[Tuple[int, int]]
         :returns: A point cloud array representing the object.
         :rtype: NDArray
         """
@@ -276,13 +522,16 @@ class EGG:
         assert (
             camera_odom is not None
         ), f"Camera odometry at timestamp {timestamp} is None"
-        camera.set_T(
+        # NOTE: Objects seen in the same frame share the pose, built once per event
+        camera.set_T_at(
+            timestamp=timestamp,
             position=camera_odom[0],
             orientation=camera_odom[1],
         )
         object_cloud = camera.depth_to_pointcloud(
             depth_image=depth_frame,
             mask=mask,
+            pixel_origin=pixel_origin,
         )
         return object_cloud
 
@@ -290,12 +539,14 @@ class EGG:
         self,
         first_timestamp: int,
         object_first_binary_mask: NDArray,
+        first_depth_frame: NDArray,
         last_timestamp: int,
         object_last_binary_mask: NDArray,
-        depth_frame_file_template: str,
+        last_depth_frame: NDArray,
         camera: Camera,
         timestamped_observation_odom: Dict[int, Dict[str, List]],
-        object_properties: Dict,
+        first_pixel_origin: Optional[Tuple[int, int]] = None,
+        last_pixel_origin: Optional[Tuple[int, int]] = None,
     ) -> Tuple[NDArray, NDArray]:
         """
         Generates point clouds for an object's first and last frames.
@@ -304,144 +555,229 @@ class EGG:
         :type first_timestamp: int
         :param object_first_binary_mask: Binary mask of the object in the first frame.
         :type object_first_binary_mask: NDArray
+        :param first_depth_frame: Depth frame of the object's initial visible frame.
+        :type first_depth_frame: NDArray
         :param last_timestamp: Timestamp of the object's last visible frame.
         :type last_timestamp: int
         :param object_last_binary_mask: Binary mask of the object in the last frame.
         :type object_last_binary_mask: NDArray
-        :param depth_frame_file_template: File path template to locate depth frames.
-        :type depth_frame_file_template: str
+        :param last_depth_frame: Depth frame of the object's last visible frame.
+        :type last_depth_frame: NDArray
         :param camera: Camera object used for depth-to-point cloud conversion.
         :type camera: Camera
         :param timestamped_observation_odom: Odometry data indexed by timestamps for object localization.
         :type timestamped_observation_odom: Dict[int, Dict[str, List]]
-        :param object_properties: Properties and metadata associated with the object.
-        :type object_properties: Dict
+        :param first_pixel_origin: [Optional] Top-left pixel of the first depth frame and mask, when they are crops.
+        :type first_pixel_origin: Optional[Tuple[int, int]]
+        :param last_pixel_origin: [Optional] Top-left pixel of the last depth frame and mask, when they are crops.
+        :type last_pixel_origin: Optional[Tuple[int, int]]
         :returns: Tuple containing the point clouds for the object's first and last frames.
         :rtype: Tuple[NDArray, NDArray]
         """
         # Add first frame
-        first_depth_frame_file = depth_frame_file_template.format(
-            frame_id=str(object_properties.get("first_frame")).zfill(4)
-        )
         obj_first_cloud = self.get_object_cloud(
             camera=camera,
             timestamp=first_timestamp,
             timestamped_observation_odom=timestamped_observation_odom,
-            depth_frame=np.load(first_depth_frame_file),
+            depth_frame=first_depth_frame,
             mask=object_first_binary_mask,
+            pixel_origin=first_pixel_origin,
         )
         # Add last frame
-        last_depth_frame_file = depth_frame_file_template.format(
-            frame_id=str(object_properties.get("last_frame")).zfill(4)
-        )
         obj_last_cloud = self.get_object_cloud(
             camera=camera,
             timestamp=last_timestamp,
             timestamped_observation_odom=timestamped_observation_odom,
-            depth_frame=np.load(last_depth_frame_file),
+            depth_frame=last_depth_frame,
             mask=object_last_binary_mask,
+            pixel_origin=last_pixel_origin,
         )
         return obj_first_cloud, obj_last_cloud
 
-    def get_object_nodes_and_edges_from_event(
+    def load_objects_from_event(
         self,
         event_data,
-        event_node_id: int,
         frame_timestamp_map: Dict[int, int],
         camera: Camera,
-        color_frame_file_template: str,
-        depth_frame_file_template: str,
+        color_frame_file: Callable[[int], str],
+        depth_frame_file: Callable[[int], str],
         timestamped_observation_odom: Dict[int, Dict[str, List]],
-        edge_captions: Optional[Dict[str, str]] = None,
-    ) -> Tuple[List[ObjectNode], List[EventObjectEdge], List[int]]:
+        max_workers: Optional[int] = None,
+    ) -> List[ObjectObservation]:
         """
-        Extracts object nodes and event edges involved in an event from the given event data.
+        Extracts the observations of the objects involved in an event from the given event data.
 
         :param event_data: Data containing details about the event and associated objects.
         :type event_data: dict
-        :param event_node_id: Unique ID for the event node.
-        :type event_node_id: int
         :param frame_timestamp_map: Mapping from frame numbers to timestamps.
         :type frame_timestamp_map: Dict[int, int]
         :param camera: Camera object for image processing and point cloud generation.
         :type camera: Camera
-        :param color_frame_file_template: Template for locating color frame image files.
-        :type color_frame_file_template: str
-        :param depth_frame_file_template: Template for locating depth frame image files.
-        :type depth_frame_file_template: str
+        :param color_frame_file: Returns the path of the color frame image with a given frame number.
+        :type color_frame_file: Callable[[int], str]
+        :param depth_frame_file: Returns the path of the depth frame array with a given frame number.
+        :type depth_frame_file: Callable[[int], str]
         :param timestamped_observation_odom: Odometry data indexed by timestamps for object localization.
         :type timestamped_observation_odom: Dict[int, Dict[str, List]]
-        :param edge_captions: [Optional] Captions for edges between event and object nodes.
-        :type edge_captions: Optional[Dict[str, str]]
-        :returns: A tuple containing lists of new object nodes, event-object edges, and involved object IDs.
-        :rtype: Tuple[List[ObjectNode], List[EventObjectEdge], List[int]]
+        :param max_workers: [Optional] Number of threads reading the frames, defaults to the CPU count.
+        :type max_workers: Optional[int]
+        :returns: The observations of every object of interest, in the event data order.
+        :rtype: List[ObjectObservation]
         """
-        new_object_nodes = []
-        event_object_edges = []
-        involved_object_ids = []
-        for object_name, object_properties in event_data.get(
-            "objects_of_interest"
-        ).items():
+        objects_of_interest = event_data.get("objects_of_interest")
+        color_frame_files = {}
+        depth_frame_files = {}
+        for object_properties in objects_of_interest.values():
+            for frame in (
+                object_properties.get("first_frame"),
+                object_properties.get("last_frame"),
+            ):
+                if frame not in color_frame_files:
+                    color_frame_files[frame] = color_frame_file(frame)
+                    depth_frame_files[frame] = depth_frame_file(frame)
+
+        def rasterize(polygon_mask: List) -> Tuple[NDArray, Tuple[int, ...]]:
+            assert isinstance(polygon_mask, List)
+            return xy_to_binary_mask_crop(
+                width=camera.width, height=camera.height, xy_polygon=polygon_mask
+            )
+
+        # NOTE: Color frames only feed the instance views, depth stays full size
+        reduction = self.instance_view_reduction
+
+        def reduced_slices(x0: int, y0: int, x1: int, y1: int) -> Tuple[slice, slice]:
+            # NOTE: Rounding the end up keeps boxes at the frame border non-empty
+            return (
+                slice(y0 // reduction, -(-y1 // reduction)),
+                slice(x0 // reduction, -(-x1 // reduction)),
+            )
+
+        # NOTE: Decoding and rasterizing release the GIL, so every frame of the
+        # event is read once and every mask drawn in threads, while the loop below
+        # consumes the results of the first objects
+        executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+        color_frames = {
+            frame: executor.submit(cv2.imread, path, IMREAD_REDUCED_FLAGS[reduction])
+            for frame, path in color_frame_files.items()
+        }
+        # NOTE: Depth frames are memory-mapped, only the object boxes are read
+        depth_frames = {
+            frame: executor.submit(np.load, path, mmap_mode="r")
+            for frame, path in depth_frame_files.items()
+        }
+        binary_masks = {
+            object_name: (
+                executor.submit(rasterize, object_properties.get("first_mask")),
+                executor.submit(rasterize, object_properties.get("last_mask")),
+            )
+            for object_name, object_properties in objects_of_interest.items()
+        }
+        executor.shutdown(wait=False)
+
+        object_observations = []
+        for object_name, object_properties in objects_of_interest.items():
             object_class = object_properties.get("object_class")
             obj_first_frame = object_properties.get("first_frame")
             first_timestamp = frame_timestamp_map[obj_first_frame]
             obj_last_frame = object_properties.get("last_frame")
             last_timestamp = frame_timestamp_map[obj_last_frame]
-            obj_first_polygon_mask = object_properties.get("first_mask")
-            assert isinstance(obj_first_polygon_mask, List)
-            obj_first_binary_mask = xy_to_binary_mask(
-                width=camera.width,
-                height=camera.height,
-                xy_polygon=obj_first_polygon_mask,
-            )
+            # NOTE: Masks only cover the padded object box, everything below
+            # works on crops of the frames to that box
+            first_mask_and_box, last_mask_and_box = binary_masks[object_name]
+            obj_first_binary_mask, (fx0, fy0, fx1, fy1) = first_mask_and_box.result()
+            obj_last_binary_mask, (lx0, ly0, lx1, ly1) = last_mask_and_box.result()
 
-            obj_first_color_frame = cv2.imread(
-                color_frame_file_template.format(frame_id=str(obj_first_frame).zfill(4))
-            )
+            obj_first_color_frame = color_frames[obj_first_frame].result()
             assert obj_first_color_frame is not None
-            obj_first_instance_view = get_instance_view(
-                map_view_img=obj_first_color_frame,
-                mask=obj_first_binary_mask[:, :, np.newaxis],
+            obj_first_color_crop = obj_first_color_frame[
+                reduced_slices(fx0, fy0, fx1, fy1)
+            ]
+            obj_first_view_mask = obj_first_binary_mask
+            if reduction > 1:
+                obj_first_view_mask = cv2.resize(
+                    obj_first_binary_mask,
+                    (obj_first_color_crop.shape[1], obj_first_color_crop.shape[0]),
+                    interpolation=cv2.INTER_NEAREST,
+                )
+            obj_first_instance_view = cv2.bitwise_and(
+                obj_first_color_crop, obj_first_color_crop, mask=obj_first_view_mask
             )
 
-            obj_last_polygon_mask = object_properties.get("last_mask")
-            assert isinstance(obj_last_polygon_mask, List)
-            obj_last_binary_mask = xy_to_binary_mask(
-                width=camera.width,
-                height=camera.height,
-                xy_polygon=obj_last_polygon_mask,
-            )
-            obj_last_color_frame = cv2.imread(
-                color_frame_file_template.format(frame_id=str(obj_last_frame).zfill(4))
-            )
+            obj_last_color_frame = color_frames[obj_last_frame].result()
             assert obj_last_color_frame is not None
-            obj_last_instance_view = get_instance_view(
-                map_view_img=obj_last_color_frame,
-                mask=obj_last_binary_mask[:, :, np.newaxis],
-                mask_bg=False,
-            )
+            obj_last_instance_view = obj_last_color_frame[
+                reduced_slices(lx0, ly0, lx1, ly1)
+            ]
 
             obj_first_cloud, obj_last_cloud = self.get_first_and_last_object_clouds(
                 first_timestamp=first_timestamp,
                 object_first_binary_mask=obj_first_binary_mask,
+                first_depth_frame=np.array(
+                    depth_frames[obj_first_frame].result()[fy0:fy1, fx0:fx1]
+                ),
                 last_timestamp=last_timestamp,
                 object_last_binary_mask=obj_last_binary_mask,
+                last_depth_frame=np.array(
+                    depth_frames[obj_last_frame].result()[ly0:ly1, lx0:lx1]
+                ),
                 camera=camera,
-                depth_frame_file_template=depth_frame_file_template,
                 timestamped_observation_odom=timestamped_observation_odom,
-                object_properties=object_properties,
+                first_pixel_origin=(fx0, fy0),
+                last_pixel_origin=(lx0, ly0),
+            )
+            # NOTE: Both positions share one (2, 3) array, rows are views into it
+            first_position, last_position = np.stack(
+                [
+                    cloud_median(obj_first_cloud, overwrite_input=True),
+                    cloud_median(obj_last_cloud, overwrite_input=True),
+                ]
             )
             # TODO: Track all instances, for now only first and last seen
-            object_node_id = self.gen_id()
+            object_observations.append(
+                ObjectObservation(
+                    name=object_name,
+                    object_class=object_class,
+                    description=object_properties.get("description"),
+                    timestamped_position={
+                        first_timestamp: first_position,
+                        last_timestamp: last_position,
+                    },
+                    instance_views=[obj_first_instance_view, obj_last_instance_view],
+                )
+            )
+        return object_observations
+
+    def get_object_nodes_and_edges_from_event(
+        self,
+        object_observations: List[ObjectObservation],
+        event_node_id: int,
+        edge_captions: Optional[Dict[str, str]] = None,
+    ) -> Tuple[List[ObjectNode], List[EventObjectEdge], List[int]]:
+        """
+        Builds the object nodes and event edges of an event from its object observations.
+
+        :param object_observations: Observations of the objects involved in the event.
+        :type object_observations: List[ObjectObservation]
+        :param event_node_id: Unique ID for the event node.
+        :type event_node_id: int
+        :param edge_captions: [Optional] Captions for edges between event and object nodes.
+        :type edge_captions: Optional[Dict[str, str]]
+        :returns: A tuple containing lists of new object nodes, event-object edges, and involved object IDs.
+        :rtype: Tuple[List[ObjectNode], List[EventObjectEdge], List[int]]
+        """
+        new_object_nodes = []
+        event_object_edges = []
+        involved_object_ids = []
+        # NOTE: One node id and one edge id per object, in the same order as before
+        entity_ids = iter(self.gen_ids(2 * len(object_observations)))
+        for object_observation in object_observations:
+            object_node_id = next(entity_ids)
             object_node = ObjectNode(
                 node_id=object_node_id,
-                object_class=object_class,
-                name=object_name,
-                timestamped_position={
-                    first_timestamp: np.median(obj_first_cloud, axis=0),
-                    last_timestamp: np.median(obj_last_cloud, axis=0),
-                },
-                instance_views=[obj_first_instance_view, obj_last_instance_view],
+                object_class=object_observation.object_class,
+                name=object_observation.name,
+                timestamped_position=object_observation.timestamped_position,
+                instance_views=object_observation.instance_views,
             )
             is_new_node, sim_node_id = self.spatial.is_new_node(
                 new_object_node=object_node, use_gt_id=self.use_gt_id
@@ -454,13 +790,13 @@ class EGG:
                 )
             involved_object_ids.append(sim_node_id)
             if self.use_gt_caption:
-                object_role = object_properties.get("description")
+                object_role = object_observation.description
             else:
                 assert edge_captions is not None
-                object_role = str(edge_captions.get(object_name))
+                object_role = str(edge_captions.get(object_observation.name))
             event_object_edges.append(
                 EventObjectEdge(
-                    edge_id=self.gen_id(),
+                    edge_id=next(entity_ids),
                     source_node_id=event_node_id,
                     target_node_id=sim_node_id,
                     object_role=object_role,
@@ -478,6 +814,19 @@ class EGG:
         self._entity_id += 1
         return self._entity_id
 
+    def gen_ids(self, n: int) -> range:
+        """
+        Reserves n consecutive unique identifiers at once.
+
+        :param n: Number of identifiers to reserve.
+        :type n: int
+        :returns: The reserved identifiers, the same gen_id would have returned.
+        :rtype: range
+        """
+        start = self._entity_id + 1
+        self._entity_id += n
+        return range(start, start + n)
+
     def pretty_str(self) -> str:
         """
         Generates a human-readable string representation of the spatial, event,
@@ -490,8 +839,7 @@ class EGG:
         egg_str += self.spatial.pretty_str()
         egg_str += self.events.pretty_str()
         edge_str = "\n🔗🔗🔗 EDGES 🔗🔗🔗\n"
-        for edge in self.event_edges:
-            edge_str += edge.pretty_str()
+        edge_str += "".join(edge.pretty_str() for edge in self.event_edges)
         egg_str += edge_str
         return egg_str
 
@@ -539,17 +887,20 @@ class EGG:
         :param json_file: Path to the JSON file containing the serialized EGG data.
         :type json_file: str
         """
-        with open(json_file, "r") as f:
-            egg_data = json.load(f)
+        with open(json_file, "rb") as f:
+            egg_data = serialization.load(f)
         nodes_data = egg_data["nodes"]
         spatial_data = nodes_data["object_nodes"]
         for object_id, object_properties in spatial_data.items():
             object_attr = object_properties["attributes"]
-            timestamped_position = {}
-            for datetime_str, pos in object_attr["timestamped_position"].items():
-                timestamped_position.update(
-                    {datetime_to_ns(str_to_datetime(datetime_str)): np.array(pos)}
-                )
+            # NOTE: Convert all positions of a node at once, rows are then views
+            positions = np.asarray(
+                list(object_attr["timestamped_position"].values()), dtype=np.float64
+            )
+            timestamped_position = {
+                str_to_ns(datetime_str): positions[i]
+                for i, datetime_str in enumerate(object_attr["timestamped_position"])
+            }
             object_node = ObjectNode(
                 node_id=int(object_id),
                 name=object_attr["name"],
@@ -563,13 +914,13 @@ class EGG:
             timestamped_observation_odom = {}
             for timestamp, odom in event_attrs["timestamped_observation_odom"].items():
                 timestamped_observation_odom.update(
-                    {datetime_to_ns(str_to_datetime(timestamp)): odom}
+                    {str_to_ns(timestamp): odom}
                 )
             event_node = EventNode(
                 node_id=int(event_id),
                 event_description=event_attrs["event_description"],
-                start=datetime_to_ns(str_to_datetime(event_attrs["start"])),
-                end=datetime_to_ns(str_to_datetime(event_attrs["end"])),
+                start=str_to_ns(event_attrs["start"]),
+                end=str_to_ns(event_attrs["end"]),
                 involved_object_ids=event_attrs["involved_object_ids"],
                 timestamped_observation_odom=timestamped_observation_odom,
                 location=event_attrs["location"],
@@ -585,6 +936,44 @@ class EGG:
                     object_role=str(edge_attrs["object_role"]),
                 )
             )
+        self._edge_table = None
+
+    def deserialize_cached(self, json_file: str):
+        """
+        Same as deserialize, but reuses a pickle of the reconstructed components
+        stored next to the JSON file, as long as it is not older than the JSON
+        and has the current GRAPH_CACHE_VERSION.
+
+        .. note::
+            Meant for a freshly constructed EGG, the cached components replace
+            the current ones instead of being added to them.
+
+        :param json_file: Path to the JSON file containing the serialized EGG data.
+        :type json_file: str
+        """
+        # NOTE: Sidecars are named <source file>.cache.<format>, as in yaml_cache
+        cache_file = json_file + ".cache.pkl"
+        if os.path.isfile(cache_file) and os.path.getmtime(
+            cache_file
+        ) >= os.path.getmtime(json_file):
+            with open(cache_file, "rb") as f:
+                cached = pickle.load(f)
+            if cached[0] == GRAPH_CACHE_VERSION:
+                logger.debug(f"Loading cached graph from {cache_file}")
+                _, self.spatial, self.events, self.event_edges = cached
+                self._edge_table = None
+                return
+            logger.debug(f"Rebuilding cached graph {cache_file} of an older layout")
+        self.deserialize(json_file)
+        try:
+            with open(cache_file, "wb") as f:
+                pickle.dump(
+                    (GRAPH_CACHE_VERSION, self.spatial, self.events, self.event_edges),
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+        except OSError as e:
+            logger.warning(f"Could not cache graph to {cache_file}: {e}")
 
     def gen_object_captions(self, llm_agent: LLMAgent):
         """
@@ -593,18 +982,65 @@ class EGG:
         :param llm_agent: Language model agent used for generating image captions.
         :type llm_agent: LLMAgent
         """
-        for obj_node_id in self.spatial.get_all_object_nodes().keys():
+        for obj_node_id in self.spatial.get_object_node_ids():
             obj_node = self.spatial.get_object_node_by_id(obj_node_id)
             assert obj_node is not None
-            obj_views_image = concatenate_images_vertically(
-                images=obj_node.instance_views
-            )
-            image_captioning_messages = build_image_captioning_messages(
-                image=obj_views_image, object_class=obj_node.object_class
+            obj_node.caption = self.caption_object_node(llm_agent, obj_node)
+
+    def caption_object_node(self, llm_agent: LLMAgent, obj_node: ObjectNode) -> str:
+        """
+        Captions the stacked instance views of an object node, reusing the caption
+        of a recently captioned identical image of the same object class.
+
+        :param llm_agent: Language model agent used for generating image captions.
+        :type llm_agent: LLMAgent
+        :param obj_node: The object node to caption.
+        :type obj_node: ObjectNode
+        :returns: The caption.
+        :rtype: str
+        """
+        obj_views_image = concatenate_images_vertically(images=obj_node.instance_views)
+        hasher = hashlib.blake2b(obj_views_image.tobytes(), digest_size=16)
+        hasher.update(f"{obj_views_image.shape}|{obj_node.object_class}".encode("utf-8"))
+        key = hasher.digest()
+        with _caption_cache_lock:
+            if key in self._caption_cache:
+                self._caption_cache.move_to_end(key)
+                return self._caption_cache[key]
+        image_captioning_messages = build_image_captioning_messages(
+            image=obj_views_image, object_class=obj_node.object_class
+        )
+        obj_caption, _, _ = llm_agent.query(image_captioning_messages)
+        assert obj_caption is not None
+        with _caption_cache_lock:
+            self._caption_cache[key] = obj_caption
+            if len(self._caption_cache) > self._caption_cache_size:
+                self._caption_cache.popitem(last=False)
+        return obj_caption
+
+    def gen_object_captions_batched(
+        self, llm_agent: LLMAgent, max_concurrency: int = 8
+    ):
+        """
+        Same as gen_object_captions, but with up to max_concurrency captioning
+        queries in flight, so captioning takes about as long as the slowest
+        queries instead of the sum of all of them.
+
+        :param llm_agent: Language model agent used for generating image captions,
+            it must be safe to query from several threads.
+        :type llm_agent: LLMAgent
+        :param max_concurrency: Maximum number of concurrent captioning queries.
+        :type max_concurrency: int
+        """
+        obj_nodes = list(self.spatial.get_object_nodes_view().values())
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            obj_captions = executor.map(
+                lambda obj_node: self.caption_object_node(llm_agent, obj_node),
+                obj_nodes,
             )
-            obj_caption, _, _ = llm_agent.query(image_captioning_messages)
-            assert obj_caption is not None
-            obj_node.caption = obj_caption
+            for obj_node, obj_caption in zip(obj_nodes, obj_captions):
+                obj_node.caption = obj_caption
 
     def gen_room_nodes(self):
         """
@@ -614,21 +1050,38 @@ class EGG:
         This method aggregates object positions within event-defined locations,
         creates room nodes in the graph with computed average positions.
         """
-        room_pos: Dict[str, List[NDArray]] = {}
-
-        for event in self.get_event_components().get_event_nodes().values():
+        # NOTE: Rooms are indexed in order of first appearance, which fixes their ids
+        room_to_idx: Dict[str, int] = {}
+        room_indices = []
+        event_positions = []
+        for event in self.events.get_event_nodes().values():
             room_name = event.location
             assert isinstance(room_name, str)
-            if room_name not in room_pos.keys():
-                room_pos[room_name] = [event.get_first_observation_pos()]
-            else:
-                room_pos[room_name].append(event.get_first_observation_pos())
+            room_indices.append(room_to_idx.setdefault(room_name, len(room_to_idx)))
+            event_positions.append(event.get_first_observation_pos())
+        if not room_to_idx:
+            return
+
+        event_positions = np.asarray(event_positions, dtype=np.float64)
+        room_indices = np.asarray(room_indices)
+        num_rooms = len(room_to_idx)
+        # NOTE: Weighted bincount per axis is a buffered group-by sum, unlike np.add.at
+        room_pos_sums = np.stack(
+            [
+                np.bincount(room_indices, weights=axis_positions, minlength=num_rooms)
+                for axis_positions in event_positions.T
+            ],
+            axis=1,
+        )
+        room_counts = np.bincount(room_indices, minlength=num_rooms)
+        room_positions = room_pos_sums / room_counts[:, np.newaxis]
 
-        for room_name, room_pos_list in room_pos.items():
+        room_node_ids = self.gen_ids(len(room_to_idx))
+        for room_name, room_idx in room_to_idx.items():
             self.spatial.add_room_node(
                 new_room_node=RoomNode(
-                    node_id=self.gen_id(),
+                    node_id=room_node_ids[room_idx],
                     name=room_name,
-                    position=np.mean(room_pos_list, axis=0),
+                    position=room_positions[room_idx],
                 )
             )
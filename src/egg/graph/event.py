@@ -1,11 +1,14 @@
 from copy import deepcopy
-from typing import Dict, Optional, List, Tuple
+from dataclasses import dataclass
+from typing import Dict, Optional, List, Sequence, Tuple
 import logging
 import sys
 
+import numpy as np
+
 from egg.graph.node import EventNode
 from egg.utils.logger import getLogger
-from egg.utils.timestamp import ns_to_datetime
+from egg.utils.timestamp import ns_to_str
 
 
 logger: logging.Logger = getLogger(
@@ -16,22 +19,109 @@ logger: logging.Logger = getLogger(
 )
 
 
+def round_odom(odom: List) -> List[List[float]]:
+    """
+    Rounds the position and orientation of an odometry entry to three decimals.
+
+    :param odom: The position and orientation lists of the odometry entry.
+    :type odom: List
+    :returns: The rounded position and orientation, as plain float lists.
+    :rtype: List[List[float]]
+    """
+    # NOTE: Plain floats, the serialized graph is also formatted into prompts
+    return [np.round(np.asarray(part, dtype=np.float64), 3).tolist() for part in odom]
+
+
+@dataclass
+class EventIndex:
+    """
+    Column-wise index of the event nodes, in insertion order, so that filtering
+    events by time, location or involved objects does not scan every node.
+
+    :param node_ids: Event node IDs.
+    :type node_ids: np.ndarray
+    :param starts: Start timestamp of each event.
+    :type starts: np.ndarray
+    :param ends: End timestamp of each event.
+    :type ends: np.ndarray
+    :param by_location: Positions of the events taking place at each location.
+    :type by_location: Dict[str, List[int]]
+    :param by_object: Positions of the events involving each object node ID.
+    :type by_object: Dict[int, List[int]]
+    """
+
+    node_ids: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+    by_location: Dict[str, List[int]]
+    by_object: Dict[int, List[int]]
+
+    @staticmethod
+    def from_event_nodes(event_nodes: Dict[int, EventNode]) -> "EventIndex":
+        """
+        Builds the index of a dictionary of event nodes.
+
+        :param event_nodes: Dictionary mapping event IDs to EventNode objects.
+        :type event_nodes: Dict[int, EventNode]
+        :returns: The event index.
+        :rtype: EventIndex
+        """
+        num_events = len(event_nodes)
+        nodes = event_nodes.values()
+        by_location: Dict[str, List[int]] = {}
+        by_object: Dict[int, List[int]] = {}
+        for position, event_node in enumerate(nodes):
+            by_location.setdefault(event_node.location, []).append(position)
+            for object_id in set(event_node.involved_object_ids):
+                by_object.setdefault(object_id, []).append(position)
+        return EventIndex(
+            node_ids=np.fromiter(event_nodes.keys(), np.int64, count=num_events),
+            starts=np.fromiter((n.start for n in nodes), np.int64, count=num_events),
+            ends=np.fromiter((n.end for n in nodes), np.int64, count=num_events),
+            by_location=by_location,
+            by_object=by_object,
+        )
+
+
 class EventComponents:
     """
     Manages the event nodes within EGG.
     """
-    def __init__(self, event_nodes: Dict[int, EventNode] = {}):
+    def __init__(self, event_nodes: Optional[Dict[int, EventNode]] = None):
         """
         Initializes EventComponents with a dictionary of event nodes.
 
-        :param event_nodes: A dictionary mapping event IDs to EventNode objects.
-        :type event_nodes: Dict[int, EventNode]
+        :param event_nodes: [Optional] A dictionary mapping event IDs to EventNode objects.
+        :type event_nodes: Optional[Dict[int, EventNode]]
         """
-        self._event_nodes = event_nodes
+        # NOTE: A fresh dict per instance, a shared default would leak nodes between graphs
+        self._event_nodes = {} if event_nodes is None else event_nodes
+        self._index: Optional[EventIndex] = None
 
     def is_empty(self) -> bool:
         return len(self._event_nodes) == 0
 
+    def snapshot(self) -> "EventComponents":
+        """
+        Returns a copy that can be changed independently, e.g. by adding or
+        replacing nodes, without copying the nodes themselves.
+
+        :returns: A shallow copy of the event components.
+        :rtype: EventComponents
+        """
+        snapshot = EventComponents(event_nodes=dict(self._event_nodes))
+        snapshot._index = self._index
+        return snapshot
+
+    def clone(self) -> "EventComponents":
+        """
+        Returns a deep copy, for callers that modify the nodes.
+
+        :returns: A deep copy of the event components.
+        :rtype: EventComponents
+        """
+        return deepcopy(self)
+
     def get_num_events(self):        
         """
         Returns the number of event nodes.
@@ -58,6 +148,7 @@ class EventComponents:
         :type event_node: EventNode
         """
         self._event_nodes.update({event_node.node_id: event_node})
+        self._index = None
 
     def replace_event_nodes(self, event_nodes: Dict[int, EventNode]):
         """
@@ -67,6 +158,26 @@ class EventComponents:
         :type event_nodes: Dict[int, EventNode]
         """
         self._event_nodes = event_nodes
+        self._index = None
+
+    def index(self) -> "EventIndex":
+        """
+        Returns the lookup index of the event nodes. The index is built once and
+        rebuilt after event nodes are added or replaced, the nodes themselves are
+        not expected to change once added.
+
+        :returns: The event index.
+        :rtype: EventIndex
+        """
+        if self._index is None:
+            self._index = EventIndex.from_event_nodes(self._event_nodes)
+        return self._index
+
+    def _select(self, positions: Sequence[int]) -> Dict[int, EventNode]:
+        node_ids = self.index().node_ids
+        return {
+            int(node_ids[i]): self._event_nodes[int(node_ids[i])] for i in positions
+        }
 
     def pretty_str(self) -> str:
         """
@@ -104,13 +215,11 @@ class EventComponents:
         :returns: Dictionary of relevant event nodes.
         :rtype: Dict[int, EventNode]
         """
-        relevant_event_nodes = {}
-        for event_node in self.get_event_nodes().values():
-            for id in object_node_ids:
-                if id in event_node.involved_object_ids:
-                    relevant_event_nodes.update({event_node.node_id: event_node})
-                    break
-        return relevant_event_nodes
+        by_object = self.index().by_object
+        positions = set()
+        for id in object_node_ids:
+            positions.update(by_object.get(id, ()))
+        return self._select(sorted(positions))
     
     def get_event_node_by_timestamp(self, timestamp: int) -> Optional[EventNode]:
         """
@@ -121,9 +230,10 @@ class EventComponents:
         :returns: The event node active at the given timestamp or None.
         :rtype: Optional[EventNode]
         """
-        for event_node in self.get_event_nodes().values():
-            if timestamp >= event_node.start and timestamp <= event_node.end:
-                return event_node
+        index = self.index()
+        active = np.flatnonzero((index.starts <= timestamp) & (index.ends >= timestamp))
+        if active.size > 0:
+            return self._event_nodes[int(index.node_ids[active[0]])]
 
     def get_event_nodes(
         self,
@@ -143,13 +253,14 @@ class EventComponents:
         :returns: Dictionary of event nodes in the specified range and location.
         :rtype: Dict[int, EventNode]
         """
-        relevant_event_nodes = {}
-        for event_node in self._event_nodes.values():
-            if event_node.is_in_time_range(
-                min_timestamp, max_timestamp
-            ) and event_node.is_in_location(locations_list):
-                relevant_event_nodes.update({event_node.node_id: event_node})
-        return relevant_event_nodes
+        index = self.index()
+        in_range = (index.starts >= min_timestamp) & (index.ends <= max_timestamp)
+        if locations_list is not None:
+            in_location = np.zeros_like(in_range)
+            for location in set(locations_list):
+                in_location[index.by_location.get(location, [])] = True
+            in_range &= in_location
+        return self._select(np.flatnonzero(in_range))
 
     def serialize(self) -> Dict:
         """
@@ -162,19 +273,18 @@ class EventComponents:
         for event_node in self.get_event_nodes().values():
             event_attr = {
                 "event_description": event_node.event_description,
-                "start": str(ns_to_datetime(event_node.start)),
-                "end": str(ns_to_datetime(event_node.end)),
+                "start": ns_to_str(event_node.start),
+                "end": ns_to_str(event_node.end),
                 "involved_object_ids": event_node.involved_object_ids,
                 "timestamped_observation_odom": {},
                 "location": event_node.location,
             }
             timestamp, pos = next(iter(event_node.timestamped_observation_odom.items()))
-            timestamp_datetime = ns_to_datetime(timestamp)
             event_attr["timestamped_observation_odom"].update(
                 {
-                    str(timestamp_datetime): {
-                        "base_odom": [[round(p, 3) for p in pl] for pl in list(pos["base_odom"])],
-                        "camera_odom": [[round(p, 3) for p in pl] for pl in list(pos["camera_odom"])],
+                    ns_to_str(timestamp): {
+                        "base_odom": round_odom(pos["base_odom"]),
+                        "camera_odom": round_odom(pos["camera_odom"]),
                     }
                 }
             )
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 import sys
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 from numpy.typing import NDArray
 import logging
@@ -179,6 +179,23 @@ class ObjectNode(SpatialNode):
     instance_views: List[NDArray] = field(default_factory=list)
     caption: Optional[str] = None
 
+    def get_position_arrays(self) -> Tuple[NDArray[np.int64], NDArray[np.float64]]:
+        """
+        Gets the timestamped positions as contiguous arrays, in insertion order.
+
+        :returns: Tuple of the (N,) timestamps and the (N, 3) positions.
+        :rtype: Tuple[NDArray[np.int64], NDArray[np.float64]]
+        """
+        timestamps = np.fromiter(
+            self.timestamped_position.keys(),
+            dtype=np.int64,
+            count=len(self.timestamped_position),
+        )
+        positions = np.asarray(
+            list(self.timestamped_position.values()), dtype=np.float64
+        ).reshape(len(timestamps), 3)
+        return timestamps, positions
+
     def is_in_event(self, event_node: EventNode):
         """
         Checks if this object is involved in a specified event.
@@ -214,20 +231,10 @@ class ObjectNode(SpatialNode):
         :returns: Tuple of the closest start and end timestamps found.
         :rtype: Tuple[int, int]
         """
-        found_start = False
-        closest_start = None
-        closest_end = None
-        for timestamp in self.timestamped_position.keys():
-            if timestamp >= start and timestamp <= end:
-                if found_start:
-                    closest_end = timestamp
-                    break
-                if timestamp >= start:
-                    closest_start = timestamp
-                    found_start = True
-        assert (
-            closest_start is not None and closest_end is not None
-        ), f"Invalid start/end: start: {start} end: {end}"
+        timestamps, _ = self.get_position_arrays()
+        in_range = np.flatnonzero((timestamps >= start) & (timestamps <= end))
+        assert in_range.size >= 2, f"Invalid start/end: start: {start} end: {end}"
+        closest_start, closest_end = timestamps[in_range[:2]].tolist()
         return closest_start, closest_end
 
     def has_been_seen(self, timestamp: int):
@@ -252,15 +259,11 @@ class ObjectNode(SpatialNode):
         :rtype: Tuple[Optional[int], Optional[np.ndarray]]
         """
         if self.has_been_seen:
-            prev_timestamp = next(iter(self.timestamped_position.keys()))
-            for timestamp in self.timestamped_position.keys():
-                if timestamp >= ref_timestamp:
-                    if prev_timestamp is not None:
-                        return (prev_timestamp, self.timestamped_position[prev_timestamp])
-                    else:
-                        return (timestamp, self.timestamped_position[timestamp])
-                else:
-                    prev_timestamp = timestamp
+            timestamps, _ = self.get_position_arrays()
+            # NOTE: Last timestamp before the first one at or after the reference
+            at_or_after = timestamps >= ref_timestamp
+            idx = int(at_or_after.argmax()) if at_or_after.any() else len(timestamps)
+            prev_timestamp = int(timestamps[max(idx - 1, 0)])
             return (prev_timestamp, self.timestamped_position[prev_timestamp])
         else:
             return (None, None)
@@ -1,11 +1,13 @@
-from typing import Dict, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 import logging
+import numpy as np
 from numpy.typing import NDArray
 from copy import deepcopy
 
 from egg.perception.instance_matching import are_similar_objects
 from egg.graph.node import ObjectNode, RoomNode
-from egg.utils.timestamp import ns_to_datetime
+from egg.utils.timestamp import ns_to_str
 from egg.utils.logger import getLogger
 
 
@@ -23,27 +25,54 @@ class SpatialComponents:
     """
     def __init__(
         self,
-        object_nodes: Dict[int, ObjectNode] = {},
-        room_nodes: Dict[int, RoomNode] = {},
-        map_views: Dict[int, NDArray] = {},
+        object_nodes: Optional[Dict[int, ObjectNode]] = None,
+        room_nodes: Optional[Dict[int, RoomNode]] = None,
+        map_views: Optional[Dict[int, NDArray]] = None,
     ):
         """
         Initializes SpatialComponents with optional dictionaries of object nodes, room nodes, and map views.
 
-        :param object_nodes: Dictionary of object nodes.
-        :type object_nodes: Dict[int, ObjectNode]
-        :param room_nodes: Dictionary of room nodes.
-        :type room_nodes: Dict[int, RoomNode]
-        :param map_views: Dictionary of map views.
-        :type map_views: Dict[int, np.ndarray]
+        :param object_nodes: [Optional] Dictionary of object nodes.
+        :type object_nodes: Optional[Dict[int, ObjectNode]]
+        :param room_nodes: [Optional] Dictionary of room nodes.
+        :type room_nodes: Optional[Dict[int, RoomNode]]
+        :param map_views: [Optional] Dictionary of map views.
+        :type map_views: Optional[Dict[int, np.ndarray]]
         """
-        self._object_nodes = object_nodes
-        self._map_views = map_views
-        self._room_nodes = room_nodes
+        # NOTE: Fresh dicts per instance, shared defaults would leak nodes between graphs
+        self._object_nodes = {} if object_nodes is None else object_nodes
+        self._map_views = {} if map_views is None else map_views
+        self._room_nodes = {} if room_nodes is None else room_nodes
+        self._name_index: Optional[Dict[str, int]] = None
 
     def is_empty(self) -> bool:
         return len(self._object_nodes) == 0
 
+    def snapshot(self) -> "SpatialComponents":
+        """
+        Returns a copy that can be changed independently, e.g. by adding or
+        replacing nodes, without copying the nodes themselves.
+
+        :returns: A shallow copy of the spatial components.
+        :rtype: SpatialComponents
+        """
+        snapshot = SpatialComponents(
+            object_nodes=dict(self._object_nodes),
+            room_nodes=dict(self._room_nodes),
+            map_views=dict(self._map_views),
+        )
+        snapshot._name_index = self._name_index
+        return snapshot
+
+    def clone(self) -> "SpatialComponents":
+        """
+        Returns a deep copy, for callers that modify the nodes.
+
+        :returns: A deep copy of the spatial components.
+        :rtype: SpatialComponents
+        """
+        return deepcopy(self)
+
     def is_new_node(
         self, new_object_node: ObjectNode, use_gt_id: bool
     ) -> Tuple[bool, int]:
@@ -57,7 +86,7 @@ class SpatialComponents:
         :returns: Tuple containing a boolean indicating if it's new and the object's ID.
         :rtype: Tuple[bool, int]
         """
-        for object_node in self.get_all_object_nodes().values():
+        for object_node in self._object_nodes.values():
             if are_similar_objects(
                 object_node_0=object_node,
                 object_node_1=new_object_node,
@@ -101,6 +130,7 @@ class SpatialComponents:
         :type new_object_node: ObjectNode
         """
         self._object_nodes.update({new_object_node.node_id: new_object_node})
+        self._name_index = None
 
     def remove_object_node(self, object_node_id: int):
         """
@@ -110,6 +140,7 @@ class SpatialComponents:
         :type object_node_id: int
         """
         self._object_nodes.pop(object_node_id)
+        self._name_index = None
 
     def replace_object_nodes(self, new_object_nodes: Dict[int, ObjectNode]):
         """
@@ -119,6 +150,7 @@ class SpatialComponents:
         :type new_object_nodes: Dict[int, ObjectNode]
         """
         self._object_nodes = new_object_nodes
+        self._name_index = None
 
     def merge_object_nodes(self, object_node_0_id: int, object_node_1: ObjectNode):
         """
@@ -176,6 +208,15 @@ class SpatialComponents:
         """
         return deepcopy(self._room_nodes)
 
+    def get_object_node_ids(self) -> List[int]:
+        """
+        Retrieves the IDs of all object nodes, without copying the nodes.
+
+        :returns: The object node IDs.
+        :rtype: List[int]
+        """
+        return list(self._object_nodes.keys())
+
     def get_all_object_nodes(self) -> Dict[int, ObjectNode]:
         """
         Retrieves all object nodes.
@@ -185,6 +226,24 @@ class SpatialComponents:
         """
         return deepcopy(self._object_nodes)
 
+    def get_object_nodes_view(self) -> Mapping[int, ObjectNode]:
+        """
+        Retrieves a read-only view of all object nodes, without copying them.
+
+        :returns: A mapping of object node IDs to the stored object nodes.
+        :rtype: Mapping[int, ObjectNode]
+        """
+        return MappingProxyType(self._object_nodes)
+
+    def get_room_nodes_view(self) -> Mapping[int, RoomNode]:
+        """
+        Retrieves a read-only view of all room nodes, without copying them.
+
+        :returns: A mapping of room node IDs to the stored room nodes.
+        :rtype: Mapping[int, RoomNode]
+        """
+        return MappingProxyType(self._room_nodes)
+
     def get_object_nodes_by_class(self, object_class: str) -> Dict[int, ObjectNode]:
         """
         Retrieves object nodes by their class.
@@ -195,7 +254,7 @@ class SpatialComponents:
         :rtype: Dict[int, ObjectNode]
         """
         object_nodes_by_class = {}
-        for object_node in self.get_all_object_nodes().values():
+        for object_node in self._object_nodes.values():
             if object_node.object_class == object_class:
                 object_nodes_by_class.update({object_node.node_id: object_node})
         return object_nodes_by_class
@@ -209,12 +268,26 @@ class SpatialComponents:
         :returns: The object node with the given name or None.
         :rtype: Optional[ObjectNode]
         """
-        for object_node in self.get_all_object_nodes().values():
+        for object_node in self._object_nodes.values():
             if object_node.name == node_name:
                 return object_node
         logger.warning(f"Trying to look for non-existent object {node_name}")
         return None
 
+    def name_index(self) -> Dict[str, int]:
+        """
+        Maps the name of each object node to its ID. The index is built once and
+        rebuilt after object nodes are added, removed or replaced.
+
+        :returns: Dictionary mapping object node names to their IDs.
+        :rtype: Dict[str, int]
+        """
+        if self._name_index is None:
+            self._name_index = {}
+            for object_node in self._object_nodes.values():
+                self._name_index.setdefault(object_node.name, object_node.node_id)
+        return self._name_index
+
     def get_room_node_by_name(self, node_name: str) -> Optional[RoomNode]:
         """
         Retrieves a room node by its name.
@@ -224,7 +297,7 @@ class SpatialComponents:
         :returns: The room node with the given name or None.
         :rtype: Optional[RoomNode]
         """
-        for room_node in self.get_all_room_nodes().values():
+        for room_node in self._room_nodes.values():
             if room_node.name == node_name:
                 return room_node
         logger.warning(f"Trying to look for non-existent room {node_name}")
@@ -254,7 +327,7 @@ class SpatialComponents:
         # TODO: Add room nodes serialization
         spatial_data = {}
 
-        for object_node in self.get_all_object_nodes().values():
+        for object_node in self._object_nodes.values():
             attr_data = {
                 "node_id": object_node.node_id,
                 "object_class": object_node.object_class,
@@ -262,11 +335,11 @@ class SpatialComponents:
                 "timestamped_position": {},
                 "caption": object_node.caption,
             }
-            for timestamp, pos in object_node.timestamped_position.items():
-                timestamp_datetime = ns_to_datetime(timestamp)
-                attr_data["timestamped_position"].update(
-                    {str(timestamp_datetime): [round(p, 3) for p in list(pos)]}
-                )
+            timestamps, positions = object_node.get_position_arrays()
+            for timestamp, pos in zip(
+                timestamps.tolist(), np.round(positions, 3).tolist()
+            ):
+                attr_data["timestamped_position"].update({ns_to_str(timestamp): pos})
 
             spatial_data.update({object_node.node_id: {"attributes": attr_data}})
 
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import logging
+import shelve
+import threading
+from typing import Any, Optional, Sequence, Tuple
+
+from egg.utils.logger import getLogger
+from egg.language.llm import LLMAgent
+
+
+logger: logging.Logger = getLogger(
+    name=__name__,
+    consoleLevel=logging.INFO,
+    fileLevel=logging.DEBUG,
+    log_file="language/cached_agent.log",
+)
+
+
+class CachedAgent(LLMAgent):
+    """
+    Wraps an LLM agent with an on-disk cache of its responses, so identical
+    queries (e.g. re-captioning the same object views on a re-run) are not
+    sent to the model again.
+
+    Cache hits return the token counts of the original response and add them
+    to the wrapped agent's totals, so the totals read the same on a re-run.
+    """
+
+    def __init__(self, agent: LLMAgent, cache_file: str = "./llm_cache"):
+        """
+        Initializes the cache around an existing agent.
+
+        :param agent: The agent whose responses are cached.
+        :type agent: LLMAgent
+        :param cache_file: Path of the shelve file storing the responses.
+        :type cache_file: str
+        """
+        # NOTE: LLMAgent.__init__ is not called, token counters are the wrapped agent's
+        self._temperature = agent.temperature
+        self.agent = agent
+        self._cache = shelve.open(cache_file)
+        self._lock = threading.Lock()
+
+    @property
+    def total_input_tokens(self) -> int:
+        return self.agent.total_input_tokens
+
+    @property
+    def total_output_tokens(self) -> int:
+        return self.agent.total_output_tokens
+
+    def _get_key(self, method: str, llm_message: Sequence, **kwargs: Any) -> str:
+        payload = json.dumps(
+            {
+                "agent": type(self.agent).__name__,
+                "model": getattr(
+                    self.agent, "model_name", getattr(self.agent, "_model_name", None)
+                ),
+                # NOTE: Aalto deployments have no model name, the URL selects them
+                "base_url": getattr(
+                    getattr(self.agent, "_model", None), "base_url", None
+                ),
+                "temperature": self.temperature,
+                "method": method,
+                "messages": llm_message,
+                "kwargs": kwargs,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _cached_call(
+        self, method: str, llm_message: Sequence, **kwargs: Any
+    ) -> Tuple[Optional[str], int, int]:
+        key = self._get_key(method, llm_message, **kwargs)
+        with self._lock:
+            cached_response = self._cache.get(key)
+        if cached_response is not None:
+            logger.debug(f"Cache hit for {method} query {key}")
+            _, input_tokens, output_tokens = cached_response
+            with self._lock:
+                self.agent.total_input_tokens += input_tokens
+                self.agent.total_output_tokens += output_tokens
+            return cached_response
+        response = getattr(self.agent, method)(llm_message=llm_message, **kwargs)
+        if response[0] is not None:
+            with self._lock:
+                self._cache[key] = response
+                self._cache.sync()
+        return response
+
+    def query(
+        self, llm_message: Sequence, count_tokens: bool = False
+    ) -> Tuple[Optional[str], int, int]:
+        return self._cached_call("query", llm_message, count_tokens=count_tokens)
+
+    def query_with_structured_output(
+        self,
+        response_format: Any,
+        llm_message: Sequence,
+        count_tokens: bool = False,
+    ) -> Tuple[Optional[str], int, int]:
+        return self._cached_call(
+            "query_with_structured_output",
+            llm_message,
+            response_format=response_format,
+            count_tokens=count_tokens,
+        )
+
+    def close(self):
+        """
+        Flushes and closes the cache file.
+        """
+        with self._lock:
+            self._cache.close()
@@ -1,4 +1,5 @@
 import os
+import threading
 from typing import Sequence, Optional, Tuple, Dict
 import httpx
 from openai import OpenAI
@@ -17,6 +18,45 @@ logger: logging.Logger = getLogger(
     log_file="language/openai_agent.log",
 )
 
+try:
+    import h2  # noqa: F401
+except ImportError:
+    h2 = None
+
+# NOTE: Sized for many concurrent judge/query threads sharing one client
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+
+_shared_http_client: Optional[httpx.Client] = None
+_shared_http_client_lock = threading.Lock()
+
+
+def make_http_client(**kwargs) -> httpx.Client:
+    """
+    Creates an HTTP client with a pool of keep-alive connections, using HTTP/2
+    when the h2 package is installed.
+
+    :param kwargs: Extra keyword arguments of httpx.Client.
+    :returns: The HTTP client.
+    :rtype: httpx.Client
+    """
+    return httpx.Client(http2=h2 is not None, limits=HTTP_LIMITS, **kwargs)
+
+
+def get_shared_http_client() -> httpx.Client:
+    """
+    Returns the HTTP client shared by all OpenAI agents of the process, so that
+    every agent reuses the same open connections instead of paying for its own
+    TCP and TLS handshakes.
+
+    :returns: The shared HTTP client.
+    :rtype: httpx.Client
+    """
+    global _shared_http_client
+    with _shared_http_client_lock:
+        if _shared_http_client is None:
+            _shared_http_client = make_http_client()
+        return _shared_http_client
+
 
 class OpenaiAgent(LLMAgent):
     def __init__(
@@ -64,12 +104,15 @@ class OpenaiAgent(LLMAgent):
                 default_headers={
                     "Ocp-Apim-Subscription-Key": api_key,
                 },
-                http_client=httpx.Client(event_hooks={"request": [update_base_url]}),
+                http_client=make_http_client(
+                    event_hooks={"request": [update_base_url]}
+                ),
             )
         else:
             self.model_name = model_name
             self._model = OpenAI(
                 api_key=os.environ.get("OPENAI_API_KEY"),
+                http_client=get_shared_http_client(),
             )
 
     def query(
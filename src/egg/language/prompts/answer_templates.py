@@ -35,6 +35,43 @@ EVALUATOR_RESPONSE_FORMAT: ResponseFormat = {
     },
 }
 
+EVALUATOR_BATCH_RESPONSE_FORMAT: ResponseFormat = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "evaluator_batch",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {
+                                "type": "integer",
+                                "description": "id of the evaluated QA pair",
+                            },
+                            "accuracy": {
+                                "type": "number",
+                                "description": "How semantically similar is the generated answer to the ground truth answer on a scale of 0 to 1",
+                            },
+                            "explanation": {
+                                "type": "string",
+                                "description": "explanation for the accuracy evaluation.",
+                            },
+                        },
+                        "required": ["id", "accuracy", "explanation"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["results"],
+            "additionalProperties": False,
+        },
+        "strict": True,
+    },
+}
+
 QUERY_RESPONSE_FORMAT: ResponseFormat = {
     "type": "json_schema",
     "json_schema": {
@@ -1,5 +1,4 @@
-from copy import deepcopy
-from typing import List, Dict
+from typing import List, Dict, Sequence, Tuple
 import logging
 
 from egg.utils.logger import getLogger
@@ -35,8 +34,58 @@ EVALUATOR_PROMPT_TEMPLATE = [
 
 
 def build_evaluator_messages(query: str, gt_answer: str, gen_answer: str) -> List[Dict]:
-    messages = deepcopy(EVALUATOR_PROMPT_TEMPLATE)
-    messages[-1]["content"] = messages[-1]["content"].format(
-        query=query, gt_answer=gt_answer, gen_answer=gen_answer
+    # NOTE: The system message is shared as is, so every call sends a byte-identical
+    # prefix that the server-side prompt cache can reuse. Only the user turn varies.
+    return [
+        EVALUATOR_PROMPT_TEMPLATE[0],
+        {
+            "role": "user",
+            "content": EVALUATOR_PROMPT_TEMPLATE[-1]["content"].format(
+                query=query, gt_answer=gt_answer, gen_answer=gen_answer
+            ),
+        },
+    ]
+
+
+EVALUATOR_BATCH_PROMPT_TEMPLATE = [
+    {
+        "role": "system",
+        "content": """
+        You are a judge for a QA system that answers human questions in a natural way.
+
+        You are given a numbered list of QA pairs, each with a query, a ground truth answer, and a generated answer.
+
+        For each QA pair, you need to evaluate how semantically accurate the generated answer is compared to the ground truth answer on a scale of 0 to 1.
+        Evaluate every QA pair independently, and report its id with the evaluation.
+        """,
+    },
+    {
+        "role": "user",
+        "content": "{qa_pairs}",
+    },
+]
+
+EVALUATOR_BATCH_ITEM_TEMPLATE = """
+            QA pair {id}:
+            Here is the query: {query}.
+            Here is the ground truth answer: {gt_answer}
+            Here is the generated answer: {gen_answer}
+            """
+
+
+def build_evaluator_messages_batch(items: Sequence[Tuple[str, str, str]]) -> List[Dict]:
+    qa_pairs = "".join(
+        EVALUATOR_BATCH_ITEM_TEMPLATE.format(
+            id=i, query=query, gt_answer=gt_answer, gen_answer=gen_answer
+        )
+        for i, (query, gt_answer, gen_answer) in enumerate(items)
     )
-    return messages
+    return [
+        EVALUATOR_BATCH_PROMPT_TEMPLATE[0],
+        {
+            "role": "user",
+            "content": EVALUATOR_BATCH_PROMPT_TEMPLATE[-1]["content"].format(
+                qa_pairs=qa_pairs
+            ),
+        },
+    ]
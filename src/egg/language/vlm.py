@@ -1,4 +1,6 @@
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import torch
 from torch import Tensor
 import numpy as np
@@ -157,6 +159,48 @@ class VLMAgent:
         self,
         yaml_param_file: str,
     ) -> Tuple[str, Dict[int, Dict[str, List]]]:
+        return self._caption_remembr_inputs(
+            self._prepare_remembr_inputs(yaml_param_file)
+        )
+
+    def generate_remembr_data_from_yamls(
+        self,
+        yaml_param_files: List[str],
+        max_workers: int = 4,
+    ) -> List[Tuple[str, Dict[int, Dict[str, List]]]]:
+        """
+        Generates the ReMEmbR data of several events.
+
+        The VLM runs one event at a time, while the event data, odometry and
+        video frames of the next events are loaded in background threads.
+
+        :param yaml_param_files: Paths to the YAML files with event parameters.
+        :type yaml_param_files: List[str]
+        :param max_workers: Number of events prepared ahead of the VLM.
+        :type max_workers: int
+        :returns: The summary caption and timestamped odometry of each event, in
+            the order of the given files.
+        :rtype: List[Tuple[str, Dict[int, Dict[str, List]]]]
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # NOTE: map submits everything upfront, bound it to keep memory flat
+            pending = deque()
+            results = []
+            for yaml_param_file in yaml_param_files:
+                pending.append(
+                    executor.submit(self._prepare_remembr_inputs, yaml_param_file)
+                )
+                if len(pending) > max_workers:
+                    remembr_inputs = pending.popleft().result()
+                    results.append(self._caption_remembr_inputs(remembr_inputs))
+            while pending:
+                remembr_inputs = pending.popleft().result()
+                results.append(self._caption_remembr_inputs(remembr_inputs))
+        return results
+
+    def _prepare_remembr_inputs(
+        self, yaml_param_file: str
+    ) -> Tuple[Tuple, Tensor, str, Dict[int, Dict[str, List]]]:
         event_data = get_event_data(yaml_param_file)
 
         event_dir = os.path.dirname(os.path.abspath(yaml_param_file))
@@ -192,6 +236,12 @@ class VLMAgent:
         masks.append(person_mask_np)
         masks = np.array(masks)
         masks = torch.from_numpy(masks).to(torch.uint8)
+        return video_tensor, masks, query, timestamped_observation_odom
+
+    def _caption_remembr_inputs(
+        self, remembr_inputs: Tuple[Tuple, Tensor, str, Dict[int, Dict[str, List]]]
+    ) -> Tuple[str, Dict[int, Dict[str, List]]]:
+        video_tensor, masks, query, timestamped_observation_odom = remembr_inputs
         summary_caption = self.generate_video_caption(
             video_tensor=video_tensor, masks=masks, query=query
         )
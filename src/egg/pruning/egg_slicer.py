@@ -76,15 +76,12 @@ class EGGSlicer:
         :rtype: Dict[int, ObjectNode]
         """
         relevant_object_nodes = {}
+        spatial = self.pruned_egg.get_spatial_components_view()
 
         for event_node in event_nodes_dict.values():
             for object_node_id in event_node.involved_object_ids:
                 if object_node_id not in relevant_object_nodes.keys():
-                    object_node = (
-                        self.pruned_egg.get_spatial_components().get_object_node_by_id(
-                            object_node_id
-                        )
-                    )
+                    object_node = spatial.get_object_node_by_id(object_node_id)
                     relevant_object_nodes.update({object_node_id: object_node})
         return relevant_object_nodes
 
@@ -95,15 +92,18 @@ class EGGSlicer:
         :param event_nodes: Dictionary of event nodes to retain.
         :type event_nodes: Dict[int, EventNode]
         """
-        pruned_edges = []
         self.pruned_egg.spatial.replace_object_nodes(
             self.get_objects_from_events(event_nodes)
         )
 
-        for edge in self.pruned_egg.get_event_edges():
-            if edge.source_node_id in event_nodes.keys():
-                pruned_edges.append(edge)
-        self.pruned_egg.set_event_edges(pruned_edges)
+        # NOTE: Edges are frozen, the kept ones are shared with the previous list
+        self.pruned_egg.set_event_edges(
+            [
+                edge
+                for edge in self.pruned_egg.event_edges
+                if edge.source_node_id in event_nodes
+            ]
+        )
 
     def prune_graph_by_objects(self, object_node_ids: List[int]):
         """
@@ -112,14 +112,17 @@ class EGGSlicer:
         :param object_node_ids: List of object node IDs to retain.
         :type object_node_ids: List[int]
         """
-        pruned_edges = []
         self.pruned_egg.events.replace_event_nodes(
             self.pruned_egg.events.get_event_nodes_by_objects(object_node_ids)
         )
-        for edge in self.pruned_egg.get_event_edges():
-            if edge.target_node_id in object_node_ids:
-                pruned_edges.append(edge)
-        self.pruned_egg.set_event_edges(pruned_edges)
+        kept_object_ids = set(object_node_ids)
+        self.pruned_egg.set_event_edges(
+            [
+                edge
+                for edge in self.pruned_egg.event_edges
+                if edge.target_node_id in kept_object_ids
+            ]
+        )
 
     def prune_graph_by_location(
         self,
@@ -173,10 +176,9 @@ class EGGSlicer:
         :type event_ids: List[int]
         """
         valid_object_ids = set()
+        events = self.pruned_egg.get_event_components_view()
         for event_id in event_ids:
-            event_node = self.pruned_egg.get_event_components().get_event_node_by_id(
-                event_id
-            )
+            event_node = events.get_event_node_by_id(event_id)
             if event_node is not None:
                 for object_id in object_ids:
                     if object_id in event_node.involved_object_ids:
@@ -194,7 +196,7 @@ class EGGSlicer:
         :returns: Tuple of the minimum and maximum timestamps.
         :rtype: Tuple[Optional[int], Optional[int]]
         """
-        return self.egg.get_event_components().get_time_range()
+        return self.egg.get_event_components_view().get_time_range()
 
     def get_locations(self) -> List[str]:
         """
@@ -203,4 +205,4 @@ class EGGSlicer:
         :returns: List of unique locations.
         :rtype: List[str]
         """
-        return self.egg.get_event_components().get_locations()
+        return self.egg.get_event_components_view().get_locations()
@@ -0,0 +1,146 @@
+import logging
+import os
+import stat
+import tempfile
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Optional, Tuple
+
+from egg.pruning.query_processor import QueryProcessor
+from egg.utils.logger import getLogger
+
+
+logger: logging.Logger = getLogger(
+    name=__name__,
+    consoleLevel=logging.INFO,
+    fileLevel=logging.DEBUG,
+    log_file="pruning/query_daemon.log",
+)
+
+AUTHKEY_SUFFIX = ".key"
+
+
+def get_default_socket() -> str:
+    """
+    Gets the default socket path of the query daemon, in a directory only the
+    current user can access.
+
+    :returns: Path of the unix socket.
+    :rtype: str
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        tempfile.gettempdir(), f"egg-{os.getuid()}"
+    )
+    return os.path.join(runtime_dir, "egg.sock")
+
+
+DEFAULT_SOCKET = get_default_socket()
+
+
+def _check_private(st: os.stat_result, path: str, file_type: int, mode: int):
+    # NOTE: Anyone who can replace the key file or socket can make the client
+    # unpickle their data, so only trust paths that belong to this user alone
+    if (
+        stat.S_IFMT(st.st_mode) != file_type
+        or st.st_uid != os.getuid()
+        or stat.S_IMODE(st.st_mode) != mode
+    ):
+        raise PermissionError(
+            f"{path} must be owned by uid {os.getuid()} with mode {oct(mode)}"
+        )
+
+
+def _check_socket_dir(address: str):
+    socket_dir = os.path.dirname(os.path.abspath(address))
+    _check_private(os.lstat(socket_dir), socket_dir, stat.S_IFDIR, 0o700)
+
+
+def _write_authkey(address: str) -> bytes:
+    authkey = os.urandom(32)
+    # NOTE: Only readable by the user, clients prove they can read it to connect
+    fd = os.open(
+        address + AUTHKEY_SUFFIX,
+        os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW,
+        0o600,
+    )
+    with os.fdopen(fd, "wb") as fp:
+        _check_private(os.fstat(fd), address + AUTHKEY_SUFFIX, stat.S_IFREG, 0o600)
+        fp.write(authkey)
+    return authkey
+
+
+def _read_authkey(address: str) -> bytes:
+    fd = os.open(address + AUTHKEY_SUFFIX, os.O_RDONLY | os.O_NOFOLLOW)
+    with os.fdopen(fd, "rb") as fp:
+        _check_private(os.fstat(fd), address + AUTHKEY_SUFFIX, stat.S_IFREG, 0o600)
+        return fp.read()
+
+
+def serve_queries(processor: QueryProcessor, address: str = DEFAULT_SOCKET):
+    """
+    Keeps a query processor resident and answers queries sent over a unix socket,
+    so the graph is only loaded once for many queries. Clients authenticate with
+    a random key written next to the socket, readable only by the current user.
+    The socket directory must be owned by the current user with mode 0700.
+
+    :param processor: The query processor answering the queries.
+    :type processor: QueryProcessor
+    :param address: Path of the unix socket to listen on.
+    :type address: str
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(address)), mode=0o700, exist_ok=True)
+    _check_socket_dir(address)
+    # NOTE: A socket left behind by a previous daemon would make bind fail
+    if os.path.exists(address):
+        os.remove(address)
+    authkey = _write_authkey(address)
+    with Listener(address, family="AF_UNIX", authkey=authkey) as listener:
+        logger.info(f"Serving queries on {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError, OSError) as e:
+                logger.warning(f"Rejected connection: {e}")
+                continue
+            with conn:
+                try:
+                    query, modality = conn.recv()
+                    logger.debug(f"Received query: {query} ({modality})")
+                    conn.send(processor.process_query(query, modality))
+                except (EOFError, OSError) as e:
+                    logger.warning(f"Client disconnected: {e}")
+                except Exception as e:
+                    logger.error(f"Failed to process query: {e}")
+                    try:
+                        conn.send(e)
+                    except (EOFError, OSError):
+                        pass
+
+
+def send_query(
+    query: str, modality: str, address: str = DEFAULT_SOCKET
+) -> Tuple[Optional[str], Optional[str], str, int, int]:
+    """
+    Sends a query to a running query daemon.
+
+    :param query: The query string to process.
+    :type query: str
+    :param modality: The modality of the query.
+    :type modality: str
+    :param address: Path of the unix socket the daemon listens on.
+    :type address: str
+    :returns: The same tuple as QueryProcessor.process_query.
+    :rtype: Tuple[Optional[str], Optional[str], str, int, int]
+    :raises FileNotFoundError: If no daemon has been started on the socket.
+    :raises ConnectionRefusedError: If the daemon that created the socket is gone.
+    :raises PermissionError: If the socket directory or key file could have been
+        replaced by another user.
+    """
+    _check_socket_dir(address)
+    authkey = _read_authkey(address)
+    with Client(address, family="AF_UNIX", authkey=authkey) as conn:
+        conn.send((query, modality))
+        response = conn.recv()
+    if isinstance(response, Exception):
+        raise response
+    return response
@@ -3,10 +3,10 @@ import sys
 from typing import Optional, Tuple
 import datetime
 import logging
-import json
 
 from egg.language.openai_agent import OpenaiAgent
 from egg.utils.language_utils import remove_code_blocks, remove_explanation_and_convert
+from egg.utils import serialization
 
 from egg.pruning.egg_slicer import EGGSlicer
 from egg.language.prompts.pruning_unified_prompts import (
@@ -295,7 +295,7 @@ class QueryProcessor:
                     response_format=PHASE_1_RESPONSE_FORMAT,
                 )
             )
-            phase_1_response_dict = json.loads(str(phase_1_response_content))
+            phase_1_response_dict = serialization.loads(str(phase_1_response_content))
             phase_1_response_dict.pop("explanation_time")
             phase_1_response_dict.pop("explanation_locations")
         else:
@@ -374,7 +374,7 @@ class QueryProcessor:
                     response_format=PHASE_2_RESPONSE_FORMAT,
                 )
             )
-            phase_2_response_dict = json.loads(str(phase_2_response_content))
+            phase_2_response_dict = serialization.loads(str(phase_2_response_content))
             phase_2_response_dict.pop("explanation_objects")
             phase_2_response_dict.pop("explanation_events")
         else:
@@ -421,7 +421,11 @@ class QueryProcessor:
         for event_id in subgraph["nodes"]["event_nodes"].keys():
             subgraph["nodes"]["event_nodes"][event_id].pop("involved_object_ids")
 
-        logger.debug(f"Optimal subgraph: {self.egg_slicer.pruned_egg.pretty_str()}")
+        # NOTE: Rendering the whole subgraph is costly, skip it when it is not logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Optimal subgraph: {self.egg_slicer.pruned_egg.pretty_str()}"
+            )
 
         self.messages[0]["content"] = self.messages[0]["content"].format(
             current_time=self.current_time, query=query, modality=modality
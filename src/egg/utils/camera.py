@@ -1,13 +1,12 @@
-from dataclasses import dataclass
-from typing import Union
-import yaml
+from dataclasses import dataclass, field
+from typing import Dict, Tuple, Union
 from scipy.spatial.transform import Rotation as R
-import cv2
 import numpy as np
 from numpy.typing import NDArray
 import logging
 
 from egg.utils.logger import getLogger
+from egg.utils import yaml_cache
 
 logger: logging.Logger = getLogger(
     name=__name__,
@@ -44,6 +43,10 @@ class Camera:
         Creates a Camera instance from a YAML file.
     set_T(position, orientation)
         Sets the extrinsic transformation matrix using position and orientation.
+    set_T_at(timestamp, position, orientation)
+        Same as set_T, reusing the matrix already built for the timestamp.
+    get_pixel_rays()
+        Normalized image plane coordinates of the pixel columns and rows.
     depth_to_pointcloud(depth_image, mask)
         Converts a depth image to a 3D point cloud.
 
@@ -56,6 +59,12 @@ class Camera:
     width: int
     height: int
     transformation_matrix: NDArray[np.float32] = np.eye(4).astype(np.float32)
+    _pose_cache: Dict[int, NDArray[np.float32]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _pixel_ray_cache: Dict[Tuple, Tuple[NDArray, NDArray]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
 
     @staticmethod
     def from_yaml(yaml_file: str):
@@ -72,8 +81,7 @@ class Camera:
         .. note::
             The transformation matrix `T` is initialized to an identity matrix.
         """
-        with open(yaml_file, "r") as f:
-            camera_info = yaml.safe_load(f)
+        camera_info = yaml_cache.load(yaml_file)
 
         return Camera(
             fx=camera_info["fx"],
@@ -100,10 +108,59 @@ class Camera:
         transformation_matrix[:3, 3] = position
         self.transformation_matrix = transformation_matrix
 
+    def set_T_at(
+        self,
+        timestamp: int,
+        position: NDArray[np.float32],
+        orientation: NDArray[np.float32],
+    ):
+        """
+        Sets the camera's extrinsic transformation matrix for the pose at a given
+        timestamp, reusing the matrix built the first time that timestamp was set.
+
+        :param timestamp: Timestamp of the pose.
+        :type timestamp: int
+        :param position: Translation vector for the camera.
+        :type position: NDArray
+        :param orientation: Quaternion representing camera orientation.
+        :type orientation: NDArray
+
+        .. note::
+            The cache lives as long as the camera, which is created per event, so
+            a timestamp always maps to the same odometry entry.
+        """
+        transformation_matrix = self._pose_cache.get(timestamp)
+        if transformation_matrix is None:
+            self.set_T(position=position, orientation=orientation)
+            self._pose_cache[timestamp] = self.transformation_matrix
+        else:
+            self.transformation_matrix = transformation_matrix
+
+    def get_pixel_rays(self) -> Tuple[NDArray[np.float32], NDArray[np.float32]]:
+        """
+        Gets the normalized image plane coordinates of every pixel column and row,
+        (u - cx) / fx and (v - cy) / fy. They are computed once per set of intrinsics.
+
+        :return: Tuple of the (width,) x and the (height,) y coordinates.
+        :rtype: Tuple[NDArray[np.float32], NDArray[np.float32]]
+        """
+        intrinsics = (self.fx, self.fy, self.cx, self.cy, self.width, self.height)
+        pixel_rays = self._pixel_ray_cache.get(intrinsics)
+        if pixel_rays is None:
+            # NOTE: The inverse intrinsic is separable, x depends on u only, y on v
+            pixel_rays = (
+                ((np.arange(self.width) - self.cx) / self.fx).astype(np.float32),
+                ((np.arange(self.height) - self.cy) / self.fy).astype(np.float32),
+            )
+            self._pixel_ray_cache.clear()
+            self._pixel_ray_cache[intrinsics] = pixel_rays
+        return pixel_rays
+
     def depth_to_pointcloud(
         self,
         depth_image: NDArray[np.float32],
         mask: Union[NDArray[np.uint8], None] = None,
+        pixel_origin: Union[Tuple[int, int], None] = None,
     ) -> NDArray[np.float32]:
         """
         Converts a depth image to a 3D point cloud using the camera's intrinsic parameters.
@@ -113,6 +170,9 @@ class Camera:
         :type depth_image: NDArray[np.float32]
         :param mask: Optional mask to filter out specific areas in the depth image.
         :type mask: Union[NDArray[np.uint8], None]
+        :param pixel_origin: Optional (u, v) pixel of the top-left corner of the depth
+                             image, when it is a crop of a full frame.
+        :type pixel_origin: Union[Tuple[int, int], None]
 
         :return: Array of 3D points derived from the depth image.
         :rtype: NDArray[np.float32]
@@ -126,41 +186,35 @@ class Camera:
             mask is provided, it is applied to the depth image before conversion.
         """
         rows, cols = depth_image.shape
-        if rows != self.height or cols != self.width:
+        u_origin, v_origin = (0, 0) if pixel_origin is None else pixel_origin
+        if pixel_origin is None and (rows != self.height or cols != self.width):
             raise AssertionError(
                 f"Depth image dimensions ({cols}, {rows}) do not match camera model "
                 + f"dimensions ({self.width}, {self.height})"
             )
-        # Apply mask to the depth image if provided
-        processed_depth = cv2.bitwise_and(depth_image, depth_image, mask=mask)
-
-        # Generate grid of pixel coordinates (u, v)
-        u_coords, v_coords = np.meshgrid(np.arange(cols), np.arange(rows))
-
-        # Flatten (u, v) arrays and extract valid depth values
-        depth_values = processed_depth.flatten()
-        valid_depth_indices = depth_values > 0
-        valid_depth_values = depth_values[valid_depth_indices]
-        u_valid = u_coords.flatten()[valid_depth_indices]
-        v_valid = v_coords.flatten()[valid_depth_indices]
-
-        # Calculate x and y coordinates in the camera plane
-        x_coords = (u_valid - self.cx) * valid_depth_values / self.fx
-        y_coords = (v_valid - self.cy) * valid_depth_values / self.fy
-
-        # Combine x, y, and depth into homogeneous coordinates
-        homogeneous_coordinates = np.vstack(
-            (
-                x_coords,
-                y_coords,
-                valid_depth_values,
-                np.ones_like(valid_depth_values),
+        if u_origin + cols > self.width or v_origin + rows > self.height:
+            raise AssertionError(
+                f"Depth crop at ({u_origin}, {v_origin}) of size ({cols}, {rows}) "
+                + f"exceeds camera model dimensions ({self.width}, {self.height})"
             )
-        )
+        # Select the masked pixels with a valid depth
+        valid_pixels = depth_image > 0
+        if mask is not None:
+            valid_pixels &= mask != 0
+        v_valid, u_valid = np.nonzero(valid_pixels)
+        # NOTE: float32 is plenty for metric depth and halves the bytes moved below
+        valid_depth_values = depth_image[v_valid, u_valid].astype(np.float32)
 
-        # Apply the extrinsic transformation matrix to compute world coordinates
-        world_coordinates = self.transformation_matrix @ homogeneous_coordinates
-
-        # Return 3D points by extracting the x, y, z components
-        point_cloud = world_coordinates[:3].T
+        # Calculate x and y coordinates in the camera plane
+        ray_x, ray_y = self.get_pixel_rays()
+        camera_points = np.empty((valid_depth_values.size, 3), dtype=np.float32)
+        camera_points[:, 0] = ray_x[u_valid + u_origin]
+        camera_points[:, 1] = ray_y[v_valid + v_origin]
+        camera_points[:, :2] *= valid_depth_values[:, np.newaxis]
+        camera_points[:, 2] = valid_depth_values
+
+        # Apply the extrinsic rotation and translation to compute world coordinates
+        rotation = self.transformation_matrix[:3, :3]
+        translation = self.transformation_matrix[:3, 3]
+        point_cloud = camera_points @ rotation.T + translation
         return point_cloud
@@ -0,0 +1,32 @@
+import logging
+from typing import IO, Any, Union
+
+import yaml
+
+from egg.utils.logger import getLogger
+
+# NOTE: LibYAML's C loader is much faster, it needs PyYAML built against libyaml
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - depends on the environment
+    from yaml import SafeLoader
+
+
+logger: logging.Logger = getLogger(
+    name=__name__,
+    consoleLevel=logging.INFO,
+    fileLevel=logging.DEBUG,
+    log_file="utils/fastyaml.log",
+)
+
+
+def safe_load(stream: Union[str, bytes, IO]) -> Any:
+    """
+    Drop-in replacement of yaml.safe_load, using the LibYAML loader when available.
+
+    :param stream: YAML document or an open file.
+    :type stream: Union[str, bytes, IO]
+    :returns: The parsed document.
+    :rtype: Any
+    """
+    return yaml.load(stream, Loader=SafeLoader)
@@ -1,6 +1,6 @@
 import math
 import base64
-from typing import List
+from typing import List, Tuple
 import numpy as np
 from numpy.typing import NDArray
 import cv2
@@ -46,19 +46,20 @@ def get_instance_view(
         Default is 5 pixels.
     :return: An image of the view of the instance.
     """
-    coords = cv2.findNonZero(mask)
-    # Get bounding box (x, y, width, height)
-    x, y, w, h = cv2.boundingRect(coords)
-    # Crop the image using the bounding box
-    if mask_bg:
-        image = cv2.bitwise_and(map_view_img, map_view_img, mask=mask)
-    else:
-        image = map_view_img
+    mask = mask if mask.dtype == np.uint8 else mask.astype(np.uint8)
+    # Get bounding box (x, y, width, height) of the non-zero mask pixels
+    x, y, w, h = cv2.boundingRect(mask)
+    image = map_view_img
     if crop:
-        image = image[
-            max(y - padding, 0) : min(y + padding + h, map_view_img.shape[0]),
-            max(x - padding, 0) : min(x + padding + w, map_view_img.shape[1]),
-        ]
+        # NOTE: Cropping first, so the background is only masked inside the box
+        box = (
+            slice(max(y - padding, 0), min(y + padding + h, map_view_img.shape[0])),
+            slice(max(x - padding, 0), min(x + padding + w, map_view_img.shape[1])),
+        )
+        image = image[box]
+        mask = mask[box]
+    if mask_bg:
+        image = cv2.bitwise_and(image, image, mask=mask)
     return image
 
 
@@ -116,9 +117,43 @@ def preprocess_image(image: NDArray, to_cuda: bool = True) -> Tensor:
 
 
 def xy_to_binary_mask(width: int, height: int, xy_polygon: List[List[int]]) -> NDArray:
-    mask = np.zeros((height, width))
-    cv2.fillPoly(img=mask, pts=[np.array(xy_polygon, dtype=np.int32)], color=1)
-    return mask.astype(np.uint8)
+    """Rasterize a polygon into a full image binary mask.
+
+    :param width: Width of the image.
+    :param height: Height of the image.
+    :param xy_polygon: Polygon vertices as (x, y) pixel coordinates.
+    :return: The uint8 mask, 1 inside the polygon and 0 elsewhere.
+    """
+    # NOTE: Filled in place as uint8, a float buffer is 8x the memory plus a cast
+    mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.fillPoly(img=mask, pts=[np.asarray(xy_polygon, dtype=np.int32)], color=1)
+    return mask
+
+
+def xy_to_binary_mask_crop(
+    width: int, height: int, xy_polygon: List[List[int]], padding: int = 5
+) -> Tuple[NDArray, Tuple[int, int, int, int]]:
+    """Rasterize a polygon only inside its padded bounding box.
+
+    The box is the same region get_instance_view crops to, so the color and
+    depth frames can be cropped first and only that region processed.
+
+    :param width: Width of the full image.
+    :param height: Height of the full image.
+    :param xy_polygon: Polygon vertices as (x, y) pixel coordinates.
+    :param padding: Padding around the bounding box of the polygon.
+    :return: The binary mask of the box, and the box as (x0, y0, x1, y1) with
+        exclusive x1 and y1.
+    """
+    pts = np.asarray(xy_polygon, dtype=np.int32)
+    x, y, w, h = cv2.boundingRect(pts)
+    x0 = max(max(x, 0) - padding, 0)
+    y0 = max(max(y, 0) - padding, 0)
+    x1 = min(min(x + w, width) + padding, width)
+    y1 = min(min(y + h, height) + padding, height)
+    mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+    cv2.fillPoly(img=mask, pts=[pts - np.array([x0, y0], dtype=np.int32)], color=1)
+    return mask, (x0, y0, x1, y1)
 
 
 def encode_image(image: NDArray, image_type: str = "image/png") -> str:
@@ -1,13 +1,13 @@
+import os
 import numpy as np
 from numpy.typing import NDArray
 import cv2
-import json
 from typing import Dict, Tuple, List
-import yaml
 import logging
 import pandas as pd
 
 from egg.utils.logger import getLogger
+from egg.utils import serialization, yaml_cache
 
 
 logger: logging.Logger = getLogger(
@@ -27,12 +27,12 @@ def get_hydra_data(dsg_path) -> Tuple[Dict, Dict, Dict]:
     :return: A tuple containing three dictionaries with instance views
         data, map views data, and 3DSG data respectively.
     """
-    with open(f"{dsg_path}/instance_views/instance_views.json") as f:
-        instance_views_data = json.load(f)
-    with open(f"{dsg_path}/map_views/map_views.json") as f:
-        map_views_data = json.load(f)
-    with open(f"{dsg_path}/backend/dsg_with_mesh.json") as f:
-        dsg_data = json.load(f)
+    with open(f"{dsg_path}/instance_views/instance_views.json", "rb") as f:
+        instance_views_data = serialization.load(f)
+    with open(f"{dsg_path}/map_views/map_views.json", "rb") as f:
+        map_views_data = serialization.load(f)
+    with open(f"{dsg_path}/backend/dsg_with_mesh.json", "rb") as f:
+        dsg_data = serialization.load(f)
     return instance_views_data, map_views_data, dsg_data
 
 
@@ -74,8 +74,8 @@ def get_image_odometry_data(
     assert (
         from_frame < to_frame
     ), f"from_frame < to_frame, but got from_frame={from_frame} >= to_frame={to_frame}"
-    with open(image_odometry_file, "r") as image_odometry_fh:
-        image_odometry_data = json.load(image_odometry_fh)
+    with open(image_odometry_file, "rb") as image_odometry_fh:
+        image_odometry_data = serialization.load(image_odometry_fh)
     frame_timestamp_map = {}
     timestamped_observation_positions = {}
     start = None
@@ -101,9 +101,33 @@ def get_image_odometry_data(
     return timestamped_observation_positions, frame_timestamp_map, start, end
 
 
+def get_event_param_files(event_dirs: List[str]) -> List[str]:
+    """
+    Lists the YAML event parameter files found in the given directories.
+
+    Each directory is scanned once and filtered by suffix, rather than
+    globbing it separately for every extension.
+
+    :param event_dirs: Directories containing the event parameter files.
+    :type event_dirs: List[str]
+    :returns: Sorted paths of all `.yaml`/`.yml` files in the directories.
+    :rtype: List[str]
+    """
+    yaml_files = []
+    for directory in event_dirs:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if (
+                    entry.name.endswith((".yaml", ".yml"))
+                    and not entry.name.startswith(".")
+                    and entry.is_file()
+                ):
+                    yaml_files.append(entry.path)
+    return sorted(yaml_files)
+
+
 def get_event_data(yaml_param_file: str):
-    with open(yaml_param_file, "r") as event_fh:
-        event_data = yaml.safe_load(event_fh)
+    event_data = yaml_cache.load(yaml_param_file)
     verify_event_data(event_data)
     return event_data
 
@@ -0,0 +1,113 @@
+from typing import Any, IO, Iterable, Iterator, Union
+import json
+import logging
+
+from egg.utils.logger import getLogger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+logger: logging.Logger = getLogger(
+    name=__name__,
+    consoleLevel=logging.INFO,
+    fileLevel=logging.DEBUG,
+    log_file="utils/serialization.log",
+)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parses a JSON document, using orjson when it is available.
+
+    :param data: JSON document as text or bytes.
+    :type data: Union[str, bytes]
+    :returns: The parsed Python object.
+    :rtype: Any
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NOTE: orjson rejects NaN and Infinity, which the stdlib writes and reads
+            pass
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serializes an object to a JSON string, using orjson when it is available.
+
+    Non-string dict keys (e.g. integer node ids) are converted to strings, the
+    same way the stdlib encoder does it. With orjson, numpy arrays and scalars
+    are serialized natively.
+
+    :param obj: Object to serialize.
+    :type obj: Any
+    :param indent: Whether to pretty-print the output.
+    :type indent: bool
+    :returns: JSON representation of the object.
+    :rtype: str
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    return json.dumps(obj, indent=2 if indent else None)
+
+
+def load(fp: IO) -> Any:
+    """
+    Parses a JSON document from an open file.
+
+    :param fp: File object opened for reading, in text or binary mode.
+    :type fp: IO
+    :returns: The parsed Python object.
+    :rtype: Any
+    """
+    return loads(fp.read())
+
+
+def dump(obj: Any, fp: IO, indent: bool = False):
+    """
+    Serializes an object as JSON into an open text file.
+
+    :param obj: Object to serialize.
+    :type obj: Any
+    :param fp: File object opened for writing in text mode.
+    :type fp: IO
+    :param indent: Whether to pretty-print the output.
+    :type indent: bool
+    """
+    fp.write(dumps(obj, indent=indent))
+
+
+def dump_lines(records: Iterable[Any], fp: IO):
+    """
+    Serializes records as newline-delimited JSON, one record per line.
+
+    :param records: Records to serialize.
+    :type records: Iterable[Any]
+    :param fp: File object opened for writing in text mode.
+    :type fp: IO
+    """
+    for record in records:
+        fp.write(dumps(record))
+        fp.write("\n")
+
+
+def load_lines(fp: IO) -> Iterator[Any]:
+    """
+    Lazily parses a newline-delimited JSON file, one record per line.
+
+    :param fp: File object opened for reading, in text or binary mode.
+    :type fp: IO
+    :returns: Iterator over the parsed records, blank lines are skipped.
+    :rtype: Iterator[Any]
+    """
+    for line in fp:
+        if line.strip():
+            yield loads(line)
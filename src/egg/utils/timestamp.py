@@ -1,6 +1,7 @@
 from typing import Dict, List
 from numpy.typing import NDArray
 from datetime import datetime
+from functools import lru_cache
 import logging
 
 from egg.utils.logger import getLogger
@@ -14,12 +15,28 @@ logger: logging.Logger = getLogger(
 )
 
 
+@lru_cache(maxsize=8192)
 def ns_to_datetime(nanoseconds: int) -> datetime:
     seconds = nanoseconds // 1_000_000_000
     dt = datetime.fromtimestamp(seconds)
     return dt
 
 
+@lru_cache(maxsize=65536)
+def ns_to_str(nanoseconds: int) -> str:
+    """
+    Same as str(ns_to_datetime(nanoseconds)), memoized since the graph is
+    serialized again for every query with the same timestamps.
+
+    :param nanoseconds: The timestamp in nanoseconds.
+    :type nanoseconds: int
+    :returns: Date in the "%Y-%m-%d %H:%M:%S" format.
+    :rtype: str
+    """
+    return str(ns_to_datetime(nanoseconds))
+
+
+@lru_cache(maxsize=8192)
 def str_to_datetime(date_string: str) -> datetime:
     date_format = "%Y-%m-%d %H:%M:%S"
     datetime_object = datetime.strptime(date_string, date_format)
@@ -33,6 +50,21 @@ def datetime_to_ns(dt: datetime) -> int:
     return int(nanoseconds_total)
 
 
+@lru_cache(maxsize=1_000_000)
+def str_to_ns(date_string: str) -> int:
+    """
+    Same as datetime_to_ns(str_to_datetime(date_string)), memoized since the
+    same timestamps recur across the nodes of a serialized graph.
+
+    :param date_string: Date in the "%Y-%m-%d %H:%M:%S" format.
+    :type date_string: str
+    :returns: The timestamp in nanoseconds.
+    :rtype: int
+    """
+    # NOTE: fromisoformat parses this format in C, unlike strptime
+    return datetime_to_ns(datetime.fromisoformat(date_string))
+
+
 def print_timestamped_position(timestamped_position: Dict[int, NDArray]) -> str:
     output_str = "\n"
     for timestamp_ns, pos in timestamped_position.items():
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+import os
 import re
 from typing import Optional, List, Tuple
 from scipy.spatial.transform import Rotation as R
@@ -30,6 +31,8 @@ OBJECT_NODE_DIM = 0.05
 EDGE_COLOR = [0.2, 0.2, 0.2]
 BASE_CAM_COLOR = [0.2, 0.2, 0.2]
 ROOM_COLOR = [0.7, 0.2, 0.6]
+# NOTE: Point clouds above this size are filtered with the tensor API
+LARGE_PCD_BYTES = 100 * 1024 * 1024
 
 
 @dataclass
@@ -49,11 +52,11 @@ class EGGVisualizer:
         pcd_z_filter: float = 2.0,
     ):
         self.egg = egg
-        self.event_ids = self.egg.get_event_components().get_event_ids()
+        self.event_ids = self.egg.get_event_components_view().get_event_ids()
         self.room_offset = 3
         self.building_offset = 4
 
-        self.slider_values = list(range(0, self.egg.get_event_components().get_num_events()))
+        self.slider_values = list(range(0, self.egg.get_event_components_view().get_num_events()))
 
         self.pcd_path = pcd_path
         self.panel_height = panel_height
@@ -83,6 +86,9 @@ class EGGVisualizer:
         if not self.pcd_path:
             return None
 
+        if os.path.getsize(self.pcd_path) > LARGE_PCD_BYTES:
+            return self._load_and_filter_large_pcd()
+
         pcd = o3d.io.read_point_cloud(self.pcd_path)
         if len(pcd.points) == 0:
             return pcd
@@ -103,6 +109,23 @@ class EGGVisualizer:
 
         return filtered_pcd
 
+    def _load_and_filter_large_pcd(self) -> o3d.geometry.PointCloud:
+        """
+        Load and filter a large point cloud with the tensor API.
+
+        The points stay in the tensor buffer while filtering, instead of being
+        copied out to numpy and back into a new legacy point cloud.
+        """
+        pcd = o3d.t.io.read_point_cloud(self.pcd_path)
+        if pcd.is_empty():
+            return pcd.to_legacy()
+
+        mask = pcd.point.positions[:, 2] < self.pcd_z_filter
+        filtered_pcd = pcd.select_by_mask(mask).to_legacy()
+        if not filtered_pcd.has_colors():
+            filtered_pcd.paint_uniform_color([0.2, 0.5, 0.7])
+        return filtered_pcd
+
     def _on_slider_value_changed(self, v):
         self.update_event(self.event_ids[int(round(v))])
 
@@ -155,7 +178,7 @@ class EGGVisualizer:
     def update_event(self, event_id: int):
         event_viz = self.draw_event_node(event_id)
         event_viz += self.draw_room_nodes()
-        event_node = self.egg.get_event_components().get_event_node_by_id(event_id)
+        event_node = self.egg.get_event_components_view().get_event_node_by_id(event_id)
         assert event_node is not None
         self.scene_widget.scene.clear_geometry()
         if self.pcd is not None:
@@ -265,7 +288,7 @@ class EGGVisualizer:
         obj_viz = []
         non_involved_ids = [
             id
-            for id in list(self.egg.spatial.get_all_object_nodes().keys())
+            for id in self.egg.spatial.get_object_node_ids()
             if id not in event_node.involved_object_ids
         ]
         for obj_node_id in non_involved_ids:
@@ -322,13 +345,10 @@ class EGGVisualizer:
         end_timestamp = event_node.end
         obs_odom = event_node.get_first_observation_odom()
         cam_pos = np.array(obs_odom["camera_odom"][0])
-        cam_orientation = R.from_quat(
-            np.array(obs_odom["camera_odom"][1])
-        ).as_matrix()
-
         base_pos = np.array(obs_odom["base_odom"][0])
-        base_orientation = R.from_quat(
-            np.array(obs_odom["base_odom"][1])
+        # NOTE: Convert both orientations in a single Rotation call
+        cam_orientation, base_orientation = R.from_quat(
+            np.array([obs_odom["camera_odom"][1], obs_odom["base_odom"][1]])
         ).as_matrix()
 
         room_node = self.egg.spatial.get_room_node_by_name(event_node.location)
@@ -0,0 +1,80 @@
+import copy
+import functools
+import json
+import logging
+import os
+import tempfile
+from typing import Any
+
+from egg.utils.logger import getLogger
+from egg.utils import fastyaml, serialization
+
+
+logger: logging.Logger = getLogger(
+    name=__name__,
+    consoleLevel=logging.INFO,
+    fileLevel=logging.DEBUG,
+    log_file="utils/yaml_cache.log",
+)
+
+CACHE_SUFFIX = ".cache.json"
+MEMORY_CACHE_SIZE = 128
+
+
+def load(path: str) -> Any:
+    """
+    Loads a YAML file through a JSON sidecar cache.
+
+    The parsed document is written next to the YAML file as <path>.cache.json,
+    and read back instead of the YAML as long as the YAML file is not newer.
+    Documents that do not survive a JSON round trip unchanged (e.g. dates or
+    non-string keys) are not cached on disk. On top of that, the last parsed
+    documents are kept in memory, keyed by path and modification time, so
+    editing a file invalidates its entry.
+
+    :param path: Path to the YAML file.
+    :type path: str
+    :returns: The parsed document, a copy callers are free to modify.
+    :rtype: Any
+    """
+    path = os.path.abspath(path)
+    return copy.deepcopy(_load_cached(path, os.stat(path).st_mtime_ns))
+
+
+@functools.lru_cache(maxsize=MEMORY_CACHE_SIZE)
+def _load_cached(path: str, mtime_ns: int) -> Any:
+    # NOTE: mtime_ns is only part of the key, a newer file is a cache miss
+    return _load_with_sidecar(path)
+
+
+def _load_with_sidecar(path: str) -> Any:
+    cache_path = path + CACHE_SUFFIX
+    try:
+        if os.stat(path).st_mtime <= os.stat(cache_path).st_mtime:
+            with open(cache_path, "rb") as fp:
+                return serialization.load(fp)
+    except (OSError, ValueError):
+        pass
+
+    with open(path, "r") as fp:
+        data = fastyaml.safe_load(fp)
+    try:
+        cache_data = json.dumps(data)
+    except TypeError:
+        return data
+    if json.loads(cache_data) != data:
+        return data
+    tmp_path = None
+    try:
+        # NOTE: A unique temporary file, so concurrent writers never share one
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(cache_path), suffix=".tmp"
+        )
+        with os.fdopen(fd, "w") as fp:
+            fp.write(cache_data)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.debug(f"Could not write YAML cache {cache_path}: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return data